@@ -6,11 +6,15 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 import uvicorn
 # from connection_manager import ConnectionManager
 from room_manager import RoomManager
-from five_crowns import  Action, GameStatus, ActionStatus
+from five_crowns import GameStatus, MIN_ROUND, NO_ACTION
 import traceback
 from loguru import logger
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from email_service import email_service
+from solver_pool import solver_pool
+from solver_registry import solver_registry
+from tablebase import tablebase
+from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -20,7 +24,17 @@ recipient_email = os.getenv("RECIPIENT_EMAIL", "")
 
 templates = Jinja2Templates(directory="templates")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Route each hand size to the fastest solver engine before serving games
+    tablebase.load()
+    solver_registry.calibrate()
+    yield
+    solver_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add this after app = FastAPI() and before other middleware
 # Only enforce trusted hosts in production
@@ -178,9 +192,14 @@ async def score_card_detail(request: Request, room_id: str):
         )
     
     # set up list of lists to represent score_card_detail
-    player_names = [player.name for player in room.game.players.values()]
-    round_scores = list(room.game.score_card.values())[: room.game.round_number - 2]
-    score_card_total = room.game.total_score_card()
+    game = room.game
+    player_names = [player.name for player in game.seats]
+    round_scores = [
+        game.score_card[round_number]
+        for round_number in range(MIN_ROUND, game.round_number + 1)
+        if round_number in game.score_card
+    ]
+    score_card_total = game.total_score_card()
     return templates.TemplateResponse(
         request,
         "score_card_detail.html",
@@ -349,33 +368,34 @@ async def process_message(room_id: str, user_id: str, message: dict):
         f"Processing message for user {user_id} in room {room_id}: {message}"
     )
     
-    if message.get("action") == "sort_cards":
-        room.game.sort_cards(
-            user_id, message.get("old_index", ""), message.get("new_index", "")
-        )
-        await room.manager.broadcast(message, room.game, message_type="all")
-    else:
-        if message.get("message_txt") and not room.game.exchange_in_progress:
-            room.game.set_current_action(message.get("message_txt",""), user_id)
+    async with room.lock:
+        if message.get("action") == "sort_cards":
+            room.game.sort_cards(
+                user_id, message.get("old_index", ""), message.get("new_index", "")
+            )
+            # Only the sorting player's hand changed
+            await room.manager.send_to(user_id)
         else:
-            message["message_txt"] = ""
-        if "Pick_from" in room.game.current_action.name:
-            message["message_txt"] = room.game.current_action.name
-
-        if room.game.exchange_in_progress:
-            card_to_exchange = message.get("cardnames")
-            if isinstance(card_to_exchange, str):
-                room.game.card_to_exchange = room.game.get_card_object_from_cardname(card_to_exchange)  # type: ignore
-        room.game.process_action(message["message_txt"], user_id)
-        await room.manager.broadcast(message, room.game, message_type="all")
-        if room.game.is_game_over():
-            room.game.process_action(
-                Action(
-                    "No_action",
-                    ActionStatus.DISABLED,
-                ),
-                user_id,
+            if message.get("message_txt") and not room.game.exchange_in_progress:
+                room.game.set_current_action(message.get("message_txt",""), user_id)
+            else:
+                message["message_txt"] = ""
+            if "Pick_from" in room.game.current_action.name:
+                message["message_txt"] = room.game.current_action.name
+
+            if room.game.exchange_in_progress:
+                card_to_exchange = message.get("cardnames")
+                if isinstance(card_to_exchange, str):
+                    room.game.card_to_exchange = room.game.get_card_object_from_cardname(card_to_exchange)  # type: ignore
+            # Solve any large hands this action will score without blocking the loop
+            await solver_pool.prefetch(
+                room.game.hands_to_score(user_id, message["message_txt"]),
+                room.game.round_number,
             )
+            room.game.process_action(message["message_txt"], user_id)
+            await room.manager.broadcast(message, room.game, message_type="all")
+            if room.game.is_game_over():
+                room.game.process_action(NO_ACTION, user_id)
 
 
 @app.post("/manual_sort/{room_id}")
@@ -398,13 +418,10 @@ async def manual_sort_endpoint(request: Request, room_id: str):
             logger.error(f"Missing data - user_id: {user_id}, new_order: {new_order}")
             return Response(status_code=400, content="Missing user_id or newOrder")
 
-        room.game.sort_cards(user_id, old_index, new_index)
-        message = {}
-        message["message_txt"] = ""
-        ding = room.game.ding
-        room.game.ding = False  # Don't ding during manual sort
-        await room.manager.broadcast(message, room.game, message_type="all")
-        room.game.ding = ding
+        async with room.lock:
+            room.game.sort_cards(user_id, old_index, new_index)
+            # Only the sorting player's hand changed
+            await room.manager.send_to(user_id)
         return {"status": "success"}
 
     except Exception as e:
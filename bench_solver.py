@@ -0,0 +1,210 @@
+"""Latency and memory benchmark for Player.score_hand_optimal.
+
+Usage:
+    python bench_solver.py                  run and print the report
+    python bench_solver.py --save           also write the JSON baseline
+    python bench_solver.py --compare        compare against the saved baseline
+
+The corpus is generated from a fixed seed so runs are comparable:
+
+    random-<n>     random deals of n cards, played in round n
+    wild-heavy     round 13 hands with 3-6 jokers plus round wilds
+    same-suit      long single-suit run hands with a few jokers
+
+Every hand is solved by a new player with an empty score cache, and the
+fastest of a few cold runs is kept. Timing and memory are measured in
+separate passes because tracemalloc slows the solver down.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from five_crowns import Card, Deck, MAX_ROUND, MIN_ROUND, Player, SUIT, score_cache
+
+BASELINE_FILE = "solver_baseline.json"
+DEFAULT_SEED = 5
+DEFAULT_HANDS = 200
+# --compare fails when p99 or max grows by more than this factor
+DEFAULT_TOLERANCE = 1.5
+# ...and by more than this many milliseconds, so sub-millisecond jitter passes
+NOISE_FLOOR_MS = 0.5
+# Each hand is timed this many times from cold and the fastest run kept
+REPEATS = 3
+
+
+def random_hands(rng: random.Random, size: int, count: int) -> list[list[Card]]:
+    cards = Deck().cards
+    return [rng.sample(cards, size) for _ in range(count)]
+
+
+def wild_heavy_hands(rng: random.Random, count: int) -> list[list[Card]]:
+    """Round 13 hands with 3-6 jokers and up to four kings."""
+    cards = Deck().cards
+    jokers = [card for card in cards if card.suit == SUIT.JOKER]
+    kings = [card for card in cards if card.rank == MAX_ROUND]
+    others = [card for card in cards if card.rank not in (MAX_ROUND, 99)]
+    hands = []
+    for i in range(count):
+        size = MAX_ROUND + i % 2  # with and without the drawn card
+        num_jokers = rng.randint(3, 6)
+        num_kings = rng.randint(0, 4)
+        hand = (
+            rng.sample(jokers, num_jokers)
+            + rng.sample(kings, num_kings)
+            + rng.sample(others, size - num_jokers - num_kings)
+        )
+        rng.shuffle(hand)
+        hands.append(hand)
+    return hands
+
+
+def same_suit_hands(rng: random.Random, count: int) -> list[list[Card]]:
+    """One suit's ranks from both decks with 0-3 jokers; runs overlap heavily."""
+    cards = Deck().cards
+    hands = []
+    for i in range(count):
+        suit = rng.choice([suit for suit in SUIT if suit != SUIT.JOKER])
+        suited = [card for card in cards if card.suit == suit and card.rank != MAX_ROUND]
+        num_jokers = i % 4
+        hand = rng.sample(suited, MAX_ROUND + 1 - num_jokers)
+        hand += [Card(SUIT.JOKER, 99)] * num_jokers
+        rng.shuffle(hand)
+        hands.append(hand)
+    return hands
+
+
+def build_corpus(seed: int = DEFAULT_SEED, count: int = DEFAULT_HANDS) -> dict:
+    """Benchmark name -> (round, hands)."""
+    rng = random.Random(seed)
+    corpus = {}
+    for size in range(MIN_ROUND, MAX_ROUND + 1):
+        corpus[f"random-{size}"] = (size, random_hands(rng, size, count))
+    corpus["wild-heavy"] = (MAX_ROUND, wild_heavy_hands(rng, count))
+    corpus["same-suit"] = (MAX_ROUND, same_suit_hands(rng, count))
+    return corpus
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def fresh_player(hand: list[Card]) -> Player:
+    """A player holding `hand` with a cold solver memo and score cache."""
+    player = Player("bench", "Bench")
+    player.hand = list(hand)
+    score_cache.clear()
+    return player
+
+
+def measure(round_num: int, hands: list[list[Card]]) -> dict:
+    timings = []
+    for hand in hands:
+        fastest = float("inf")
+        for _ in range(REPEATS):
+            player = fresh_player(hand)
+            start = time.perf_counter()
+            player.score_hand_optimal(round_num)
+            fastest = min(fastest, time.perf_counter() - start)
+        timings.append(fastest)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for hand in hands:
+            player = fresh_player(hand)
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            player.score_hand_optimal(round_num)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    score_cache.clear()
+
+    return {
+        "round": round_num,
+        "hands": len(hands),
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(timings, 0.99) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(seed: int = DEFAULT_SEED, count: int = DEFAULT_HANDS) -> dict:
+    results = {
+        name: measure(round_num, hands)
+        for name, (round_num, hands) in build_corpus(seed, count).items()
+    }
+    return {"seed": seed, "hands": count, "results": results}
+
+
+def compare(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """Benchmarks whose p99 or max latency regressed beyond tolerance."""
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        for field in ("p99_ms", "max_ms"):
+            slower = current[field] - previous[field]
+            if current[field] > previous[field] * tolerance and slower > NOISE_FLOOR_MS:
+                regressions.append(
+                    f"{name} {field}: {previous[field]} -> {current[field]}"
+                )
+    return regressions
+
+
+def print_report(report: dict, baseline: dict | None = None) -> None:
+    print(f"{'benchmark':<12} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'peak KiB':>9}")
+    for name, result in report["results"].items():
+        line = (
+            f"{name:<12} {result['p50_ms']:>8} {result['p99_ms']:>8}"
+            f" {result['max_ms']:>8} {result['peak_kib']:>9}"
+        )
+        previous = baseline["results"].get(name) if baseline else None
+        if previous and previous["p99_ms"]:
+            line += f"   p99 x{result['p99_ms'] / previous['p99_ms']:.2f}"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--hands", type=int, default=DEFAULT_HANDS)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="write the baseline")
+    parser.add_argument("--compare", action="store_true", help="check the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Same corpus as the baseline, whatever was passed on the command line
+        args.seed, args.hands = baseline["seed"], baseline["hands"]
+
+    report = run(args.seed, args.hands)
+    print_report(report, baseline)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,138 @@
+import asyncio
+import os
+from collections import deque
+
+from dotenv import load_dotenv
 from fastapi import WebSocket, WebSocketDisconnect
-from content import Content
+from content import Content, USER_ID_SLOT
 from five_crowns import Game
 from loguru import logger
 
+# Load environment variables from .env file
+load_dotenv()
+
+SEND_QUEUE_POLICIES = ("resync", "disconnect")
+
+# Fragments each broadcast type covers, in the order they are sent
+BROADCAST_FRAGMENTS = {
+    "all": (
+        "game_alert", "player_alert", "table", "discard",
+        "out_cards", "score", "turn", "actions",
+    ),
+    "alert": ("game_alert", "player_alert", "out_cards"),
+    "table": ("table", "discard", "out_cards"),
+    "score": ("out_cards", "score"),
+    "turn": ("out_cards", "turn"),
+    "action": ("out_cards", "actions"),
+    "login": ("out_cards", "logins"),
+}
+# Game.versions key behind each fragment; fragments not listed are always sent
+FRAGMENT_VERSIONS = {
+    "game_alert": "alerts",
+    "player_alert": "alerts",
+    "table": "hand:{user_id}",
+    "discard": "discard",
+    "out_cards": "out_cards",
+    "score": "score",
+    "turn": "turn",
+    "actions": "actions",
+}
+
+
+class Outbox:
+    """Bounded queue of messages for one connection, drained by its own writer task.
+
+    When the queue is full the policy decides what happens: resync replaces the
+    queued messages with one frame of the full current state (see
+    ConnectionManager.queue), and disconnect gives up on the connection. Under
+    resync a message that still does not fit, e.g. a disconnect notice, drops
+    the oldest one and the next broadcast resends everything.
+    """
+
+    def __init__(self, websocket: WebSocket, size: int, policy: str) -> None:
+        self.websocket = websocket
+        self.size = size
+        self.policy = policy
+        self.queue: deque[str] = deque()
+        self.ready = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.dropped = 0
+        # Game.versions key -> version already queued on this connection
+        self.seen: dict[str, int] = {}
+        self.task: asyncio.Task | None = None
+
+    def put(self, message: str) -> bool:
+        """Queue a message; False when the connection should be disconnected."""
+        if len(self.queue) >= self.size:
+            if self.policy == "disconnect":
+                return False
+            self.queue.popleft()
+            self.dropped += 1
+            # The client missed something, so the next broadcast sends everything
+            self.seen.clear()
+        self.queue.append(message)
+        self.idle.clear()
+        self.ready.set()
+        return True
+
+    def has_room(self, count: int) -> bool:
+        return len(self.queue) + count <= self.size
+
+    async def run(self) -> None:
+        """Send queued messages in order until cancelled or a send fails."""
+        try:
+            while True:
+                if not self.queue:
+                    self.idle.set()
+                    self.ready.clear()
+                    await self.ready.wait()
+                    continue
+                message = self.queue.popleft()
+                await self.websocket.send_text(message)
+        finally:
+            self.idle.set()
+
+    def close(self) -> None:
+        if self.task is not None and self.task is not asyncio.current_task():
+            self.task.cancel()
+        self.queue.clear()
+
 
 class ConnectionManager:
     def __init__(self, game: Game, room_id: str = "", room_name: str = "") -> None:
         self.active_connections = {}
+        self.outboxes: dict[str, Outbox] = {}
         self.game = game
         self.room_id = room_id
         self.room_name = room_name
+        self.queue_size = int(os.getenv("SEND_QUEUE_SIZE", "32"))
+        self.queue_policy = os.getenv("SEND_QUEUE_POLICY", "resync")
+        # single: one frame per user per broadcast, separate: one frame per fragment
+        self.framing = os.getenv("BROADCAST_FRAMING", "single")
+        # Pending websocket closes; the event loop only keeps weak references to tasks
+        self.closing: set[asyncio.Task] = set()
+
+        if self.queue_policy not in SEND_QUEUE_POLICIES:
+            logger.warning(f"Unknown SEND_QUEUE_POLICY {self.queue_policy}, using resync")
+            self.queue_policy = "resync"
 
     async def connect(self, user_id: str, websocket: WebSocket):
         message = {"message_txt": ""}
         await websocket.accept()
         self.active_connections[user_id] = websocket
+        self.outbox(user_id, websocket)
+        # A new or reconnecting client gets the whole current state first
+        await self.send_to(user_id, "all")
         # Notify current clients of new login
         await self.broadcast(message, game=self.game, message_type="login")
 
     async def disconnect(self, user_id: str, websocket: WebSocket | None = None):
         # Remove connection safely without raising if it was already removed
         removed = self.active_connections.pop(user_id, None)
+        outbox = self.outboxes.pop(user_id, None)
+        if outbox is not None:
+            outbox.close()
         if removed:
             logger.debug(f"Disconnected {user_id}")
         else:
@@ -30,66 +142,168 @@ class ConnectionManager:
         # Send a message and let the caller handle any exceptions so we can centralize cleanup in broadcast
         await websocket.send_text(message)
 
+    def outbox(self, user_id: str, websocket: WebSocket) -> Outbox:
+        """The connection's outbox, starting its writer task on first use."""
+        outbox = self.outboxes.get(user_id)
+        if outbox is not None and outbox.websocket is websocket:
+            return outbox
+        if outbox is not None:
+            outbox.close()
+        outbox = Outbox(websocket, self.queue_size, self.queue_policy)
+        outbox.task = asyncio.create_task(self.write(user_id, outbox))
+        self.outboxes[user_id] = outbox
+        return outbox
+
+    async def write(self, user_id: str, outbox: Outbox) -> None:
+        try:
+            await outbox.run()
+        except WebSocketDisconnect:
+            logger.warning(f"WebSocketDisconnect for {user_id}")
+        except Exception as e:
+            # Any send error should cause the connection to be removed so it doesn't hang the server
+            logger.error(f"Error sending to {user_id}: {e}")
+        else:
+            return
+        # A reconnect may already have replaced this outbox
+        if self.outboxes.get(user_id) is outbox:
+            self.drop([user_id])
+
+    def drop(self, dead: list[str]) -> None:
+        """Remove dead connections and tell the remaining users (best effort)."""
+        for uid in dead:
+            self.active_connections.pop(uid, None)
+            outbox = self.outboxes.pop(uid, None)
+            if outbox is not None:
+                outbox.close()
+
+        notice = f"{', '.join(dead)} has disconnected"
+        for uid, ws in list(self.active_connections.items()):
+            if not self.outbox(uid, ws).put(notice):
+                logger.error(f"Failed to notify {uid} about disconnect, queue full")
+
+    async def close(self, user_id: str, websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception as e:
+            logger.debug(f"Could not close websocket for {user_id}: {e}")
+
+    async def drain(self) -> None:
+        """Wait until every queued message has been sent."""
+        while not all(outbox.idle.is_set() for outbox in self.outboxes.values()):
+            await asyncio.gather(*(outbox.idle.wait() for outbox in self.outboxes.values()))
+
+    def render_shared(self, names: set[str]) -> dict[str, str]:
+        """Fragments that are the same for every player, rendered once per broadcast."""
+        content = Content(self.game, "", self.room_id, self.room_name)
+        shared = {}
+        if "game_alert" in names:
+            shared["game_alert"] = content.show_game_alert()
+        if "out_cards" in names:
+            shared["out_cards"] = content.show_out_cards()
+        if "score" in names:
+            shared["score"] = content.show_score_card()
+        if "turn" in names:
+            shared["turn"] = content.show_turn()
+        if "actions" in names:
+            shared["actions"] = content.show_actions(USER_ID_SLOT)
+        if "logins" in names:
+            shared["logins"] = content.show_logins()
+        return shared
+
+    def render_for_user(
+        self, user_id: str, shared: dict[str, str], names: list[str]
+    ) -> dict[str, str]:
+        """Fragment name -> message for one player: their own hand and alerts plus the shared fragments."""
+        content = Content(self.game, user_id, self.room_id, self.room_name)
+        messages = {}
+        for name in names:
+            if name == "player_alert":
+                messages[name] = content.show_player_alert(user_id)
+            elif name == "table":
+                messages[name] = content.show_table()
+            elif name == "discard":
+                if self.game.top_discard():
+                    messages[name] = content.show_discard()
+            elif name == "actions":
+                messages[name] = shared[name].replace(USER_ID_SLOT, user_id)
+            else:
+                messages[name] = shared[name]
+        return messages
+
+    def changed(self, user_id: str, outbox: Outbox, message_type: str) -> list[str]:
+        """Fragments of this broadcast type whose game version the connection has not seen."""
+        names = []
+        updates = {}
+        for name in BROADCAST_FRAGMENTS[message_type]:
+            key = FRAGMENT_VERSIONS.get(name)
+            if key is None:
+                names.append(name)
+                continue
+            key = key.format(user_id=user_id)
+            version = self.game.versions.get(key, 0)
+            if outbox.seen.get(key) != version:
+                updates[key] = version
+                names.append(name)
+        outbox.seen.update(updates)
+        return names
+
+    def queue(
+        self,
+        user_id: str,
+        websocket: WebSocket,
+        shared: dict[str, str],
+        names: list[str],
+    ) -> bool:
+        """Render the named fragments for one user into their outbox; False if it is full."""
+        self.game.user_id = user_id
+        outbox = self.outbox(user_id, websocket)
+        messages = list(self.render_for_user(user_id, shared, names).values())
+        if self.framing == "single":
+            # Every fragment is a complete out-of-band swap, so they can share a frame
+            messages = ["".join(messages)]
+        if outbox.policy == "resync" and not outbox.has_room(len(messages)):
+            # Queued messages would be dropped along with fragments only they carry,
+            # so replace the whole queue with one frame of the full current state
+            outbox.queue.clear()
+            outbox.seen.clear()
+            names = self.changed(user_id, outbox, "all") + ["logins"]
+            shared = {**shared, **self.render_shared(set(names) - set(shared))}
+            messages = ["".join(self.render_for_user(user_id, shared, names).values())]
+        for table in messages:
+            if not outbox.put(table):
+                logger.warning(f"Send queue full for {user_id}, disconnecting")
+                # Closing lets the client reconnect and fetch the current state
+                task = asyncio.create_task(self.close(user_id, websocket))
+                self.closing.add(task)
+                task.add_done_callback(self.closing.discard)
+                return False
+        return True
+
+    async def send_to(self, user_id: str, message_type: str = "table"):
+        """Queue the changed fragments for one user only, e.g. after they sort their hand."""
+        websocket = self.active_connections.get(user_id)
+        if websocket is None:
+            return
+        names = self.changed(user_id, self.outbox(user_id, websocket), message_type)
+        if names and not self.queue(user_id, websocket, self.render_shared(set(names)), names):
+            self.drop([user_id])
+
     async def broadcast(self, message: dict, game: Game, message_type: str = "all"):
+        """Queue the room's fragments for every connection; writer tasks do the sending."""
+        # Writers for connections removed elsewhere (e.g. a room reset) are stopped
+        for uid in [uid for uid in self.outboxes if uid not in self.active_connections]:
+            self.outboxes.pop(uid).close()
+
+        changed = {
+            user_id: self.changed(user_id, self.outbox(user_id, websocket), message_type)
+            for user_id, websocket in self.active_connections.items()
+        }
+        shared = self.render_shared(set().union(*changed.values()))
         # Iterate over a snapshot so we can remove dead connections safely
         dead = []
         for user_id, websocket in list(self.active_connections.items()):
-            self.game.user_id = user_id
-            content = Content(self.game, user_id, self.room_id, self.room_name)
-            try:
-                if message_type in ("all", "alert"):
-                    table = content.show_game_alert()
-                    await self.send_personal_message(table, websocket)
-                    table = content.show_player_alert(user_id)
-                    await self.send_personal_message(table, websocket)
-
-                if message_type in ("all", "table"):
-                    table = content.show_table()
-                    await self.send_personal_message(table, websocket)
-                    if game.top_discard():
-                        table = content.show_discard()
-                        await self.send_personal_message(table, websocket)
-
-                table = content.show_out_cards()
-                await self.send_personal_message(table, websocket)
-
-                if message_type in ("all", "score"):
-                    table = content.show_score_card()
-                    await self.send_personal_message(table, websocket)
-
-                if message_type in ("all", "turn"):
-                    table = content.show_turn()
-                    await self.send_personal_message(table, websocket)
-
-                if message_type in ("all", "action"):
-                    table = content.show_actions()
-                    await self.send_personal_message(table, websocket)
-
-                if message_type == "login":
-                    table = content.show_logins()
-                    await self.send_personal_message(table, websocket)
-
-            except WebSocketDisconnect:
-                logger.warning(f"WebSocketDisconnect for {user_id}")
-                dead.append(user_id)
-            except Exception as e:
-                # Any send error should cause the connection to be removed so it doesn't hang the server
-                logger.error(f"Error broadcasting to {user_id}: {e}")
+            if changed[user_id] and not self.queue(user_id, websocket, shared, changed[user_id]):
                 dead.append(user_id)
 
         if dead:
-            # remove dead connections
-            for uid in dead:
-                self.active_connections.pop(uid, None)
-
-            # Notify remaining users that someone disconnected (best effort)
-            try:
-                notice = {"message_txt": f"{', '.join(dead)} has disconnected"}
-                for uid, ws in list(self.active_connections.items()):
-                    try:
-                        await ws.send_text(notice["message_txt"])
-                    except Exception as e:
-                        logger.error(f"Failed to notify {uid} about disconnect: {e}")
-                        self.active_connections.pop(uid, None)
-            except Exception as e:
-                logger.error(f"Failed to send disconnect notice: {e}")
+            self.drop(dead)
@@ -1,4 +1,5 @@
 from jinja2 import Environment, FileSystemLoader
+from five_crowns import HINT_BUDGET
 
 file_loader = FileSystemLoader("templates")
 env = Environment(loader=file_loader)
@@ -12,6 +13,9 @@ out_cards_template = env.get_template("out_cards.html")
 score_card_template = env.get_template("score_card.html")
 logins_template = env.get_template("logins.html")
 
+# Stands in for the user id in fragments rendered once for every player
+USER_ID_SLOT = "__user_id__"
+
 
 class Content:
     def __init__(self, game, user_id: str, room_id: str = "", room_name: str = "") -> None:
@@ -27,22 +31,24 @@ class Content:
         self.discard_prompt = False
 
         # Always display all cards in player's hand
-        self.display_cards = []
-        for card_number, card in enumerate(player.hand):
-            card.card_number = card_number
-            self.display_cards.append(card)
+        self.display_cards = list(player.hand)
 
         # Only enable checkboxes/discard prompt during exchange and user's turn
+        suggested_discard = None
         if self.game.exchange_in_progress and self.game.your_turn():
             if player.name == self.players[self.user_id].name:
                 self.discard_prompt = True
                 self.checkbox_required = True
+                discards = player.best_discards(self.game.round_number, HINT_BUDGET)
+                if discards:
+                    suggested_discard = player.get_index(discards[0][0])
 
         keep_discard = "Keep" if self.game.keep_cards else "discard"
         output = card_template.render(
             cards=self.display_cards,
             checkbox_required=self.checkbox_required,
             discard_prompt=self.discard_prompt,
+            suggested_discard=suggested_discard,
             player=player,
             keep_discard=keep_discard,
             room_id=self.room_id,
@@ -62,6 +68,7 @@ class Content:
         # Only show cards for the current user_id
         player = self.game.player(self.user_id)
         self.show_player(player)
+        self.table += "</div>"
         return self.table
 
     def show_discard(self):
@@ -80,6 +87,7 @@ class Content:
                 room_id=self.room_id,
                 room_name=self.room_name,
             )
+            discard_html += "</div>"
             return discard_html
 
     def show_out_cards(self):
@@ -112,6 +120,7 @@ class Content:
             room_id=self.room_id,
             room_name=self.room_name,
         )
+        score_card_total_txt += "</div>"
         return score_card_total_txt
 
     def show_player(self, player):
@@ -131,9 +140,11 @@ class Content:
         )
         return output
 
-    def show_actions(self):
+    def show_actions(self, user_id: str | None = None):
+        if user_id is None:
+            user_id = self.game.user_id
         output = actions_template.render(
-            actions=self.game.actions, user_id=self.game.user_id, room_id=self.room_id, room_name=self.room_name
+            actions=self.game.actions, user_id=user_id, room_id=self.room_id, room_name=self.room_name
         )
         return output
 
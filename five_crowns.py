@@ -1,10 +1,10 @@
 import random
 import actions
+import meld_solver
+from solver_registry import solver_registry
 from loguru import logger
 from enum import Enum
-from collections import defaultdict
-import itertools
-from functools import lru_cache
+from collections import OrderedDict
 
 
 KEEP_CARDS = False
@@ -14,6 +14,10 @@ NUM_OF_ROUNDS = MAX_ROUND - MIN_ROUND + 1
 CARD_VALUES = {n: n for n in range(3, MAX_ROUND + 1)}
 CARD_VALUES.update({99: 50})  # A=15, Joker=50
 CARD_ORDER = list(range(MIN_ROUND, MAX_ROUND + 1))
+SCORE_CACHE_SIZE = 4096
+# Seconds the bounded solver may spend on auto-sort and the discard hint
+SORT_BUDGET = 0.02
+HINT_BUDGET = 0.02
 
 
 class ActionStatus(Enum):
@@ -43,20 +47,47 @@ class No_Card(Exception):
 
 
 class Card:
-    def __init__(self, suit: SUIT, rank: int) -> None:
-        self.suit = suit
-        self.rank = rank
+    """A card face. Cards are interned flyweights: Card(suit, rank) always
+    returns the same object, so decks and hands share the 56 instances and
+    equality is identity.
+
+    `code` is a small int (see meld_solver.JOKER_CODE) and `name` the
+    "suit-rank" string the templates send back.
+    """
+
+    __slots__ = ("suit", "rank", "code", "name")
+    _interned: dict[tuple[SUIT, int], "Card"] = {}
+
+    def __new__(cls, suit: SUIT, rank: int) -> "Card":
+        card = cls._interned.get((suit, rank))
+        if card is None:
+            raise ValueError(f"No such card: {suit} {rank}")
+        return card
+
+    @classmethod
+    def _intern(cls, suit: SUIT, rank: int, code: int) -> None:
+        card = object.__new__(cls)
+        card.suit = suit
+        card.rank = rank
+        card.code = code
+        card.name = f"{suit.value}-{rank}"
+        cls._interned[(suit, rank)] = card
+
+    def __reduce__(self):
+        # Unpickling goes through __new__, so it returns the interned card
+        return Card, (self.suit, self.rank)
 
     def __eq__(self, other):
-        if not isinstance(other, Card):
-            return False
-        return self.suit == other.suit and self.rank == other.rank
+        return self is other
 
     def __lt__(self, other):
         return self.rank < other.rank
 
     def __hash__(self):
-        return hash((self.suit, self.rank))
+        return self.code
+
+    def __repr__(self) -> str:
+        return f"Card({self.name})"
 
     @property
     def suit_html(self):
@@ -87,46 +118,248 @@ class Card:
         return str(self.rank)
 
 
+def _intern_cards() -> tuple[Card, ...]:
+    for suit_index, suit in enumerate(SUIT):
+        if suit == SUIT.JOKER:
+            Card._intern(suit, meld_solver.JOKER_RANK, meld_solver.JOKER_CODE)
+            continue
+        for rank in range(MIN_ROUND, MAX_ROUND + 1):
+            Card._intern(suit, rank, meld_solver.cell_index(suit_index, rank))
+    return tuple(sorted(Card._interned.values(), key=lambda card: card.code))
+
+
+# Every distinct card by code and by name
+CARDS: tuple[Card, ...] = _intern_cards()
+CARD_BY_NAME: dict[str, Card] = {card.name: card for card in CARDS}
+# The double deck: two copies of every natural card and three jokers
+DECK_CARDS: tuple[Card, ...] = (
+    CARDS[: meld_solver.JOKER_CODE] + (CARDS[meld_solver.JOKER_CODE],) * 3
+) * 2
+
+
+def card_from_name(name: str) -> Card:
+    """The card for a "suit-rank" name as sent by the hand templates."""
+    card = CARD_BY_NAME.get(name)
+    if card is None:
+        raise ValueError(f"No such card: {name}")
+    return card
+
+
+def encode_hand(hand: list[Card]) -> bytes:
+    """A hand as one byte per card code, e.g. for storage or the solver."""
+    return bytes(card.code for card in hand)
+
+
+def decode_hand(codes: bytes) -> list[Card]:
+    return [CARDS[code] for code in codes]
+
+
 class Deck:
-    def __init__(self) -> None:
-        self.cards: list[Card] = []
-        for _ in range(2):
-            for suit in SUIT:
-                if suit == SUIT.JOKER:
-                    continue
-                for rank in range(3, 14):
-                    self.cards.append(Card(suit, rank))
-            self.cards.append(Card(SUIT.JOKER, 99))
-            self.cards.append(Card(SUIT.JOKER, 99))
-            self.cards.append(Card(SUIT.JOKER, 99))
+    """The draw pile. The top of the deck is the end of `cards`, so drawing
+    and dealing only ever shrink the list from the end."""
+
+    def __init__(self, rng: random.Random | None = None) -> None:
+        self.cards: list[Card] = list(reversed(DECK_CARDS))
+        self.rng = rng if rng is not None else random.Random()
 
     def shuffle(self):
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
 
     def draw(self) -> Card:
-        return self.cards.pop(0)
+        return self.cards.pop()
+
+    def deal(self, num_players: int, num_cards: int) -> list[list[Card]]:
+        """Deal num_cards to each player, one at a time around the table."""
+        total = num_players * num_cards
+        if total > len(self.cards):
+            raise No_Card("Not enough cards left to deal")
+        dealt = self.cards[len(self.cards) - total :][::-1]
+        del self.cards[len(self.cards) - total :]
+        return [dealt[seat::num_players] for seat in range(num_players)]
+
+    def restock(self, cards: list[Card]) -> None:
+        """Replace the empty deck with `cards`, e.g. the old discard pile, and shuffle."""
+        self.cards = cards
+        self.shuffle()
 
     def cards_remaining(self):
         return len(self.cards)
 
     def __repr__(self) -> str:
-        return " ".join(
-            [str(self.card.rank) + self.card.suit.value for self.card in self.cards]
-        )
+        # Top of the deck first
+        return " ".join(str(card.rank) + card.suit.value for card in reversed(self.cards))
+
+
+class HandScoreCache:
+    """Bounded LRU of solved hands.
+
+    Keys are the round plus the packed card counts, so card order and which
+    physical duplicate is held do not matter. Only the hand-independent
+    solution is stored; it is laid out onto the caller's cards on every hit.
+    """
+
+    def __init__(self, maxsize: int = SCORE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def solve(
+        self,
+        hand: list[Card],
+        round_num: int,
+        evaluator: meld_solver.HandEvaluator | None = None,
+        search: meld_solver.MeldSearch | None = None,
+    ) -> dict:
+        if evaluator is None:
+            packed = meld_solver.pack_hand(hand, round_num)
+        else:
+            packed = evaluator.packed(hand, round_num)
+            # The player's own memo wins when it already holds this hand
+            if search is None or (*packed, 0) in evaluator.search.memo:
+                search = evaluator.search
+        key = (round_num, *packed)
+        solution = self.entries.get(key)
+        if solution is None:
+            self.misses += 1
+            solution = solver_registry.solve(*packed, len(hand), search)
+            self.put(key, solution)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return meld_solver.layout_hand(hand, round_num, solution)
+
+    @staticmethod
+    def key(hand: list[Card], round_num: int) -> tuple:
+        return (round_num, *meld_solver.pack_hand(hand, round_num))
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.entries
+
+    def put(self, key: tuple, solution: tuple) -> None:
+        """Store a solution computed elsewhere, e.g. in a worker process."""
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def solve_bounded(
+        self,
+        hand: list[Card],
+        round_num: int,
+        budget: float,
+        evaluator: meld_solver.HandEvaluator | None = None,
+    ) -> dict:
+        """Like solve, but stops searching after `budget` seconds.
+
+        The result has an extra "optimal" flag, and only proven results are
+        cached.
+        """
+        if evaluator is None:
+            packed = meld_solver.pack_hand(hand, round_num)
+        else:
+            packed = evaluator.packed(hand, round_num)
+        key = (round_num, *packed)
+        solution = self.entries.get(key)
+        optimal = True
+        if solution is None:
+            self.misses += 1
+            solution, optimal = meld_solver.solve_bounded(*packed, budget)
+            if optimal:
+                self.put(key, solution)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        result = meld_solver.layout_hand(hand, round_num, solution)
+        result["optimal"] = optimal
+        return result
+
+    def can_go_out(
+        self,
+        hand: list[Card],
+        round_num: int,
+        evaluator: meld_solver.HandEvaluator | None = None,
+    ) -> bool:
+        """True when the hand scores 0, answered from the cache or memo when possible."""
+        if evaluator is None:
+            packed = meld_solver.pack_hand(hand, round_num)
+        else:
+            packed = evaluator.packed(hand, round_num)
+        solution = self.entries.get((round_num, *packed))
+        if solution is None and evaluator is not None:
+            # e.g. the hand left after a discard that best_discards already scored
+            solution = evaluator.search.memo.get((*packed, 0))
+        if solution is not None:
+            self.hits += 1
+            return solution[0] == 0
+        self.misses += 1
+        return meld_solver.can_cover(*packed)
+
+    def solve_many(
+        self,
+        hands: list[list[Card]],
+        round_num: int,
+        evaluators: list[meld_solver.HandEvaluator] | None = None,
+    ) -> list[dict]:
+        """Solve several hands with one shared search.
+
+        Identical hands are solved once through the cache, and the search
+        memo is shared, so sub-hands common to several players are only
+        explored once. A hand whose evaluator memo already holds it is
+        replayed from that memo instead.
+        """
+        search = meld_solver.MeldSearch()
+        if evaluators is None:
+            evaluators = [None] * len(hands)
+        return [
+            self.solve(hand, round_num, evaluator, search)
+            for hand, evaluator in zip(hands, evaluators)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+score_cache = HandScoreCache()
 
 
 class Player:
     def __init__(self, id: str, name: str) -> None:
         self.id: str = id
         self.name: str = name
+        self.evaluator = meld_solver.HandEvaluator()
         self.hand: list[Card] = []
         self.player_alert: str = ""
         self.last_turn_played: bool = False
         self.score: int = 0
         self.total_score: int = 0
 
+    @property
+    def hand(self) -> list[Card]:
+        return self._hand
+
+    @hand.setter
+    def hand(self, cards: list[Card]) -> None:
+        self._hand = cards
+        self.evaluator.invalidate()
+
     def reset(self):
         self.hand: list[Card] = []
+        self.evaluator.reset()
         self.player_alert = ""
         self.last_turn_played = False
 
@@ -137,11 +370,15 @@ class Player:
         raise No_Card("Card to discard not found in hand")
 
     def draw(self, deck: Deck) -> None:
-        self.hand.append((deck.draw()))
+        self.add_card(deck.draw())
+
+    def add_card(self, card: Card) -> None:
+        self.hand.append(card)
+        self.evaluator.add(card)
 
     def discard(self, card: Card, deck: Deck, game=None) -> None:
         index = self.get_index(card)
-        self.hand.pop(index)
+        self.evaluator.remove(self.hand.pop(index))
         if game is not None:
             game.discard_pile.append(card)
 
@@ -155,7 +392,7 @@ class Player:
         self.player_alert = ""
 
     def auto_sort_hand(self, round_num):
-        score = self.score_hand_optimal(round_num)
+        score = self.score_hand_bounded(round_num, SORT_BUDGET)
         books = score["books"]
         runs = score["runs"]
         remaining = score["remaining"]
@@ -177,6 +414,25 @@ class Player:
         self.score = score.get("score", 0)
         return score
 
+    def best_discards(
+        self, round_num: int, budget: float | None = None
+    ) -> list[tuple[Card, int]]:
+        """Every card in hand with the score left after discarding it, best first."""
+        scores = self.evaluator.discard_scores(self.hand, round_num, budget)
+        return sorted(zip(self.hand, scores), key=lambda pair: pair[1])
+
+    def can_go_out(self, round_num: int) -> bool:
+        """True when the whole hand can be melded; cheaper than score_hand."""
+        return score_cache.can_go_out(self.hand, round_num, self.evaluator)
+
+    def score_hand_bounded(self, round_num: int, budget: float) -> dict:
+        """Best arrangement found within `budget` seconds; see score_hand_optimal.
+
+        The result's "optimal" flag says whether it is proven minimal. Unlike
+        score_hand this does not update the player's score.
+        """
+        return score_cache.solve_bounded(self.hand, round_num, budget, self.evaluator)
+
     def score_hand_optimal(self, round_num):
         """
         hand: list[Card]
@@ -184,213 +440,12 @@ class Player:
 
         Returns dict with books, runs, assigned wilds, remaining, score.
         """
-
-        wild_rank = round_num  # e.g. round 8 → 8 is wild
-
-        # build card dicts
-        cards = []
-        for idx, card in enumerate(self.hand):
-            is_joker = card.rank == 99 or card.suit == SUIT.JOKER
-            is_round_wild = card.rank == wild_rank
-            is_wild = is_joker or is_round_wild
-            cards.append(
-                {
-                    "id": idx,
-                    "card": card,
-                    "rank": card.rank,
-                    "suit": card.suit,
-                    "is_joker": is_joker,
-                    "is_round_wild": is_round_wild,
-                    "is_wild": is_wild,
-                }
-            )
-
-        card_length = len(cards)
-        wild_ids = [card["id"] for card in cards if card["is_wild"]]
-
-        normals_by_rank = defaultdict(list)
-        normals_by_suit_rank = defaultdict(lambda: defaultdict(list))
-        for card in cards:
-            if not card["is_wild"]:
-                normals_by_rank[card["rank"]].append(card["id"])
-                normals_by_suit_rank[card["suit"]][card["rank"]].append(card["id"])
-
-        groups = []
-        seen = set()
-
-        def register_group(group_type, ids_tuple, assigned_map):
-            ids_tuple = tuple(sorted(ids_tuple))
-            key = (group_type, ids_tuple, tuple(sorted(assigned_map.items())))
-            if key in seen:
-                return
-            seen.add(key)
-            value = sum(CARD_VALUES[cards[i]["rank"]] for i in ids_tuple)
-            groups.append(
-                {
-                    "type": group_type,
-                    "ids": ids_tuple,
-                    "assigned": dict(assigned_map),
-                    "value": value,
-                }
-            )
-
-        # --- Books (3–5 of same rank) ---
-        for rank in CARD_ORDER:
-            normals = normals_by_rank.get(rank, [])
-            max_size = min(5, len(normals) + len(wild_ids))
-            for size in range(3, max_size + 1):
-                min_normals = max(0, size - len(wild_ids))
-                max_normals = min(len(normals), size)
-                for k in range(min_normals, max_normals + 1):
-                    for normals_subset in itertools.combinations(normals, k):
-                        wild_needed = size - k
-                        for wild_subset in itertools.combinations(
-                            wild_ids, wild_needed
-                        ):
-                            ids = tuple(sorted(normals_subset + wild_subset))
-                            assigned = {wid: (rank, None) for wid in wild_subset}
-                            register_group("book", ids, assigned)
-
-        # --- Runs (length ≥3) ---
-        for suit in SUIT:
-            if suit == SUIT.JOKER:
-                continue
-            rank_map = normals_by_suit_rank.get(suit, {})
-            for start in range(len(CARD_ORDER)):
-                for L in range(3, len(CARD_ORDER) - start + 1):
-                    seq = CARD_ORDER[start : start + L]
-                    # prune if impossible
-                    if len(seq) > len(rank_map) + len(wild_ids):
-                        continue
-                    opts = []
-                    for rank_label in seq:
-                        normals_here = rank_map.get(rank_label, [])
-                        opts.append([None] + normals_here)  # None = wild slot
-
-                    seen_assign = set()
-
-                    def rec(pos, used_normals, used_wilds, ids_list, assigned_map):
-                        if len(used_wilds) > len(wild_ids):
-                            return
-                        if pos == L:
-                            ids_tuple = tuple(sorted(ids_list))
-                            key = (ids_tuple, tuple(sorted(assigned_map.items())))
-                            if key in seen_assign:
-                                return
-                            seen_assign.add(key)
-                            register_group("run", ids_tuple, assigned_map)
-                            return
-                        for opt in opts[pos]:
-                            if opt is None:
-                                for wid in wild_ids:
-                                    if wid in used_wilds:
-                                        continue
-                                    new_assigned = dict(assigned_map)
-                                    new_assigned[wid] = (seq[pos], suit)
-                                    rec(
-                                        pos + 1,
-                                        used_normals,
-                                        used_wilds | {wid},
-                                        ids_list + [wid],
-                                        new_assigned,
-                                    )
-                            else:
-                                if opt in used_normals:
-                                    continue
-                                rec(
-                                    pos + 1,
-                                    used_normals | {opt},
-                                    used_wilds,
-                                    ids_list + [opt],
-                                    assigned_map,
-                                )
-
-                    rec(0, frozenset(), frozenset(), [], {})
-
-        # runs of only wilds
-        if len(wild_ids) >= 3:
-            for suit in SUIT:
-                if suit == SUIT.JOKER:
-                    continue
-                for start in range(len(CARD_ORDER)):
-                    for L in range(3, min(len(CARD_ORDER) - start, len(wild_ids)) + 1):
-                        seq = CARD_ORDER[start : start + L]
-                        for wild_subset in itertools.combinations(wild_ids, L):
-                            assigned = {
-                                wid: (seq[i], suit) for i, wid in enumerate(wild_subset)
-                            }
-                            register_group("run", tuple(sorted(wild_subset)), assigned)
-
-        # --- DP to select disjoint groups ---
-        for group in groups:
-            mask = 0
-            for i in group["ids"]:
-                mask |= 1 << i
-            group["mask"] = mask
-
-        @lru_cache(None)
-        def dp(mask):
-            best_val = 0
-            best_choice = None
-            for gi, group in enumerate(groups):
-                if (mask & group["mask"]) == 0:
-                    new_mask = mask | group["mask"]
-                    val_next, _ = dp(new_mask)
-                    val_with = group["value"] + val_next
-                    if val_with > best_val:
-                        best_val = val_with
-                        best_choice = (gi, new_mask)
-            return best_val, best_choice
-
-        total_value_removed, choice = dp(0)
-        chosen_groups = []
-        mask = 0
-        while choice is not None:
-            gi, next_mask = choice
-            chosen_groups.append(groups[gi])
-            mask = next_mask
-            _, choice = dp(mask)
-
-        books_out, runs_out, assigned_wilds_out = [], [], []
-        for group in chosen_groups:
-            card_list = [cards[i]["card"] for i in group["ids"]]
-            if group["type"] == "book":
-                books_out.append(card_list)
-            else:
-                runs_out.append(card_list)
-            for wid, (as_rank, as_suit) in group["assigned"].items():
-                if cards[wid]["is_wild"]:
-                    assigned_wilds_out.append(
-                        {
-                            "card": cards[wid]["card"],
-                            "assigned_rank": as_rank,
-                            "assigned_suit": as_suit,
-                            "used_for": group["type"],
-                        }
-                    )
-
-        remaining_ids = [i for i in range(card_length) if not (mask & (1 << i))]
-        remaining = [cards[i]["card"] for i in remaining_ids]
-        # Wildcards (jokers & round wilds) count as 20 when left over, jokers as 50
-        score = 0
-        for i in remaining_ids:
-            if cards[i]["is_joker"]:
-                score += 50
-            elif cards[i]["is_round_wild"]:
-                score += 20
-            else:
-                score += CARD_VALUES[cards[i]["rank"]]
-
-        return {
-            "books": books_out,
-            "runs": runs_out,
-            "assigned_wilds": assigned_wilds_out,
-            "remaining": remaining,
-            "score": score,
-        }
+        return score_cache.solve(self.hand, round_num, self.evaluator)
 
 
 class Action:
+    __slots__ = ("name", "action_status", "text")
+
     def __init__(
         self,
         name: str,
@@ -405,13 +460,64 @@ class Action:
         return self.name
 
 
+# The action catalog, in display order. A game's action state is one int
+# with a bit per catalog entry, and the Action objects below are shared.
+ACTION_NAMES = (
+    "Start",
+    "Restart",
+    "Pick_from_deck",
+    "Pick_from_discard",
+    "Go_out",
+    "Next_round",
+    "Sort_cards",
+)
+ACTION_BIT = {name: 1 << index for index, name in enumerate(ACTION_NAMES)}
+# Actions enable_all_actions turns on; the rest follow the state of the game
+ALWAYS_ENABLED = ACTION_BIT["Sort_cards"]
+NO_ACTION = Action("No_action", ActionStatus.DISABLED)
+_ACTION_STATES = {
+    name: {
+        status: Action(name, status, actions.actions_text.get(name, "NOT FOUND"))
+        for status in ActionStatus
+    }
+    for name in ACTION_NAMES
+}
+_ACTION_VIEWS: dict[int, list[Action]] = {}
+
+
+def action_view(enabled: int) -> list[Action]:
+    """The catalog as Action objects for an enabled-bitmask, built once per mask."""
+    view = _ACTION_VIEWS.get(enabled)
+    if view is None:
+        view = _ACTION_VIEWS[enabled] = [
+            _ACTION_STATES[name][
+                ActionStatus.ENABLED if enabled & ACTION_BIT[name] else ActionStatus.DISABLED
+            ]
+            for name in ACTION_NAMES
+        ]
+    return view
+
+
+# Parts of the page that broadcasts update; each hand is versioned as "hand:<player id>"
+FRAGMENTS = ("alerts", "discard", "turn", "score", "actions", "out_cards")
+
+
 class Game:
-    def __init__(self) -> None:
+    def __init__(self, seed: int | None = None) -> None:
+        # Every shuffle and the first player come from this game's own RNG,
+        # so a game can be replayed from its seed
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        self.rng = random.Random(self.seed)
         self.round_number = MIN_ROUND - 1
         self.players: dict[str, Player] = {}
+        # Players in seat (join) order, and id/name -> seat, kept by add_player
+        self.seats: list[Player] = []
+        self.seat_of: dict[str, int] = {}
+        self.seat_by_name: dict[str, int] = {}
         self.game_status: GameStatus = GameStatus.NOT_STARTED
-        self.actions: list[Action] = []
-        self.current_action: Action = Action("No_action", ActionStatus.DISABLED)
+        # Enabled-bitmask over ACTION_NAMES; None until add_all_actions
+        self.enabled_actions: int | None = None
+        self.current_action: Action = NO_ACTION
         self.current_player_index: int = 0
         self.current_dealer_index: int = 0
         self.game_alert: str = ""
@@ -426,14 +532,27 @@ class Game:
         self.round_winner: str = ""
         self.out_cards: list[Card] | None = []
         self.out_cards_player_id: str = ""
+        # Round -> scores in seat order, and each seat's running total
         self.score_card: dict[int, list[int]] = {}
+        self.score_totals: list[int] = []
         self.ding: bool = False
+        # Fragment -> version when it last changed; broadcasts skip what a client has seen
+        self.version = 0
+        self.versions: dict[str, int] = {}
+
+    def touch(self, *fragments: str) -> None:
+        """Mark fragments as changed; with no arguments, every fragment and hand."""
+        if not fragments:
+            fragments = FRAGMENTS + tuple(f"hand:{player_id}" for player_id in self.players)
+        self.version += 1
+        for fragment in fragments:
+            self.versions[fragment] = self.version
 
     def deal_cards(self) -> None:
         # Number of cards dealt to each player equals the round number (rounds are 3..13)
-        for _ in range(self.round_number):
-            for player in self.players.values():
-                player.draw(self.deck)
+        hands = self.deck.deal(len(self.players), self.round_number)
+        for player, hand in zip(self.players.values(), hands):
+            player.hand = hand
         # Add one card to discard pile after initial deal
         self.discard_pile.append(self.deck.draw())  # type: ignore
 
@@ -443,23 +562,26 @@ class Game:
         return None
 
     def add_player(self, player_id: str, player_name: str) -> bool:
-        if player_name in [player.name for player in self.players.values()]:
+        if player_name in self.seat_by_name:
             return False
-        self.players[player_id] = Player(player_id, player_name)
+        player = Player(player_id, player_name)
+        self.players[player_id] = player
+        self.seat_of[player_id] = self.seat_by_name[player_name] = len(self.seats)
+        self.seats.append(player)
         for round_number in range(MIN_ROUND, MAX_ROUND + 1):
-            self.score_card[round_number] = [0 for player in self.players.values()]
+            self.score_card.setdefault(round_number, []).append(0)
+        self.score_totals.append(0)
+        self.touch()
         return True
 
     def next_turn(self) -> None:
         self.ding = True  # this is temporary
+        self.touch("turn", "alerts")
         self.next_player()
         self.clear_all_player_alerts()
         if not self.last_turn_in_round:
             self.clear_game_alerts()
-        self.current_action = Action(
-            "No_action",
-            ActionStatus.DISABLED,
-        )
+        self.current_action = NO_ACTION
 
     def next_player(self):
         self.current_player_index += 1
@@ -477,66 +599,26 @@ class Game:
     def whose_turn(self) -> int:
         return self.current_player_index
 
+    def seat_name(self, seat: int) -> str:
+        if self.game_status == GameStatus.IN_PROGRESS and 0 <= seat < len(self.seats):
+            return self.seats[seat].name
+        return ""
+
     def whose_turn_name(self) -> str:
-        name = ""
-        if self.game_status == GameStatus.IN_PROGRESS:
-            for i, player in enumerate(self.players):
-                if i == self.current_player_index:
-                    if self.players[player].name:
-                        name = self.players[player].name
-        return name
+        return self.seat_name(self.current_player_index)
 
     def whose_dealer_name(self) -> str:
-        name = ""
-        if self.game_status == GameStatus.IN_PROGRESS:
-            for i, player in enumerate(self.players):
-                if i == self.current_dealer_index:
-                    if self.players[player].name:
-                        name = self.players[player].name
-        return name
+        return self.seat_name(self.current_dealer_index)
+
+    @property
+    def actions(self) -> list[Action]:
+        if self.enabled_actions is None:
+            return []
+        return action_view(self.enabled_actions)
 
     def add_all_actions(self):
-        self.actions = []
-        for (
-            name,
-            self.action_status,
-        ) in [
-            (
-                "Start",
-                ActionStatus.DISABLED,
-            ),
-            (
-                "Restart",
-                ActionStatus.DISABLED,
-            ),
-            (
-                "Pick_from_deck",
-                ActionStatus.DISABLED,
-            ),
-            (
-                "Pick_from_discard",
-                ActionStatus.DISABLED,
-            ),
-            (
-                "Go_out",
-                ActionStatus.DISABLED,
-            ),
-            (
-                "Next_round",
-                ActionStatus.DISABLED,
-            ),
-            (
-                "Sort_cards",
-                ActionStatus.DISABLED,
-            ),
-        ]:
-            self.actions.append(
-                Action(
-                    name,
-                    self.action_status,
-                    actions.actions_text.get(name, "NOT FOUND"),
-                )
-            )
+        self.enabled_actions = 0
+        self.touch("actions")
         if self.game_status == GameStatus.WAITING:
             self.enable_one_action("Start")
 
@@ -544,39 +626,31 @@ class Game:
             self.disable_one_action("Start")
 
     def enable_one_action(self, action_name):
-        for self.action in self.actions:
-            if self.action.name == action_name:
-                self.action.action_status = ActionStatus.ENABLED
+        if self.enabled_actions is not None:
+            self.enabled_actions |= ACTION_BIT.get(action_name, 0)
+            self.touch("actions")
 
     def disable_one_action(self, action_name):
-        for self.action in self.actions:
-            if self.action.name == action_name:
-                self.action.action_status = ActionStatus.DISABLED
+        if self.enabled_actions is not None:
+            self.enabled_actions &= ~ACTION_BIT.get(action_name, 0)
+            self.touch("actions")
 
     def enable_all_actions(self):
-        for self.action in self.actions:
-            if self.action.name not in (
-                "Start",
-                "Restart",
-                "Pick_from_discard",
-                "Pick_from_deck",
-                "Go_out",
-                "Next_round",
-            ):
-                self.action.action_status = ActionStatus.ENABLED
+        if self.enabled_actions is not None:
+            self.enabled_actions |= ALWAYS_ENABLED
+            self.touch("actions")
 
     def action_from_action_name(self, action_name: str) -> Action:
-        default_action = Action(
-            "No_action",
-            ActionStatus.DISABLED,
-        )
-        for action in self.actions:
-            if action.name == action_name:
-                return action
-        return default_action
+        states = _ACTION_STATES.get(action_name)
+        if states is None or self.enabled_actions is None:
+            return NO_ACTION
+        if self.enabled_actions & ACTION_BIT[action_name]:
+            return states[ActionStatus.ENABLED]
+        return states[ActionStatus.DISABLED]
 
     def exchange(self, user_id):
         self.user_id = user_id
+        self.touch(f"hand:{user_id}", "discard", "alerts")
 
         if not self.card_to_exchange and self.exchange_in_progress:
             self.player(self.user_id).set_player_alert(
@@ -591,12 +665,12 @@ class Game:
             if self.current_action.name == "Pick_from_deck":
                 self.player(self.user_id).draw(self.deck)
                 if self.deck.cards_remaining() == 0:
-                    self.deck.cards = self.discard_pile[:-1]
-                    self.discard_pile = [self.discard_pile[-1]]
-                    self.deck.shuffle()
+                    top = self.discard_pile.pop()
+                    self.deck.restock(self.discard_pile)
+                    self.discard_pile = [top]
 
             if self.current_action.name == "Pick_from_discard":
-                self.player(self.user_id).hand.append(self.discard_pile.pop())  # type: ignore
+                self.player(self.user_id).add_card(self.discard_pile.pop())
             self.exchange_in_progress = True
 
         if self.card_to_exchange:
@@ -607,10 +681,8 @@ class Game:
                 self.players[self.user_id].last_turn_played = True
                 self.go_out()
             else:
-                if (
-                    not self.players[str(self.current_action_player_id)]
-                    .score_hand(self.round_number)
-                    .get("score")
+                if self.players[str(self.current_action_player_id)].can_go_out(
+                    self.round_number
                 ):
                     self.go_out()
                 else:
@@ -625,15 +697,16 @@ class Game:
         self.set_game_status(GameStatus.IN_PROGRESS)
         self.add_all_actions()
         self.enable_all_actions()
-        self.current_player_index = random.randint(0, len(self.players) - 1)
+        self.current_player_index = self.rng.randint(0, len(self.players) - 1)
         self.current_dealer_index = (self.current_player_index - 1) % len(self.players)
         self.start_round()
 
     def start_round(self) -> None:
+        self.touch()
         self.game_alert = "Round Over"
         self.last_turn_in_round = 0
         self.round_number += 1
-        self.deck = Deck()
+        self.deck = Deck(self.rng)
         self.deck.shuffle()
 
         for player in self.players.values():
@@ -652,9 +725,10 @@ class Game:
             self.enable_one_action("Restart")
 
     def your_turn(self) -> bool:
-        whose_turn = self.whose_turn_name()
-        name = self.players[self.user_id].name
-        return whose_turn == name
+        return (
+            self.game_status == GameStatus.IN_PROGRESS
+            and self.seat_of.get(self.user_id) == self.current_player_index
+        )
 
     def process_action(self, action: Action|str, user_id: str):
         self.ding = False
@@ -664,6 +738,7 @@ class Game:
             action = self.action_from_action_name(action)
         if action.name == "Sort_cards":
             self.players[self.user_id].auto_sort_hand(self.round_number)
+            self.touch(f"hand:{self.user_id}")
             pass
         if action.name == "Restart":
             self.set_game_status(GameStatus.IN_PROGRESS)
@@ -699,12 +774,9 @@ class Game:
 
     def go_out(self):
         # validate cards and return if not valid  #TODO probably not necessary any more
-        if (
-            self.players[str(self.current_action_player_id)]
-            .score_hand(self.round_number)
-            .get("score")
-            and not self.last_turn_in_round
-        ):
+        if not self.last_turn_in_round and not self.players[
+            str(self.current_action_player_id)
+        ].can_go_out(self.round_number):
             self.game_alert = f"You don't have the correct score to go out - {self.players[str(self.current_action_player_id)].score_hand(self.round_number).get('score')}"
 
         # allow for one more hand per person
@@ -713,7 +785,9 @@ class Game:
             self.round_winner = self.whose_turn_name()
 
         self.game_alert = f"{self.round_winner} went out-LAST TURN of round!!!"
-        self.out_cards = self.players[str(self.current_action_player_id)].hand
+        self.touch("alerts", "out_cards")
+        # A copy, so the out player sorting their hand later does not change what others see
+        self.out_cards = list(self.players[str(self.current_action_player_id)].hand)
         self.out_cards_player_id = self.current_action_player_id
         if self.last_turn_in_round < len(self.players):
             self.next_turn()
@@ -733,10 +807,8 @@ class Game:
             return False
 
     def player_id(self, name) -> str:
-        for i, player in enumerate(self.players):
-            if self.players[player].name == name:
-                return self.players[player].id
-        return ""
+        seat = self.seat_by_name.get(name)
+        return "" if seat is None else self.seats[seat].id
 
     def player(self, user_id) -> Player:
         try:
@@ -745,7 +817,9 @@ class Game:
             return None  # type: ignore
 
     def set_game_status(self, game_status: GameStatus):
-        self.game_status = game_status
+        if game_status != self.game_status:
+            self.game_status = game_status
+            self.touch("turn")
 
     def get_game_status(self) -> GameStatus:
         return self.game_status
@@ -768,14 +842,15 @@ class Game:
     def clear_all_player_alerts(self):
         for player in self.players.values():
             player.clear_player_alert()
+        self.touch("alerts")
 
     def clear_game_alerts(self):
         self.game_alert = ""
+        self.touch("alerts")
 
     def player_id_from_index(self, index: int) -> str:
-        for i, player in enumerate(self.players):
-            if i == index:
-                return self.players[player].id
+        if 0 <= index < len(self.seats):
+            return self.seats[index].id
         return ""
 
     def next_user_id(self):
@@ -791,12 +866,12 @@ class Game:
     def reset(self):
         self.round_number = MIN_ROUND - 1
         self.players: dict[str, Player] = {}
+        self.seats = []
+        self.seat_of = {}
+        self.seat_by_name = {}
         self.set_game_status(GameStatus.NOT_STARTED)
-        self.actions: list[Action] = []
-        self.current_action: Action = Action(
-            "No_action",
-            ActionStatus.DISABLED,
-        )
+        self.enabled_actions = None
+        self.current_action: Action = NO_ACTION
         self.current_action_player_id: str = ""
         self.current_player_index: int = 0
         self.current_dealer_index: int = 0
@@ -812,13 +887,14 @@ class Game:
         # self.round_over: bool = False
         self.out_cards: list[Card] | None = []
         self.out_cards_player_id: str = ""
+        # Round -> scores in seat order, and each seat's running total
         self.score_card: dict[int, list[int]] = {}
+        self.score_totals: list[int] = []
         self.ding: bool = False
+        self.touch()
 
     def get_card_object_from_cardname(self, cardname: str):
-        suit = SUIT(cardname.split("-")[0])
-        rank = int(cardname.split("-")[1])
-        return Card(suit, rank)
+        return card_from_name(cardname)
 
     def sort_cards(self, user_id: str, old_index: int, new_index: int):
         """Reorder cards in player's hand based on drag and drop action"""
@@ -840,26 +916,63 @@ class Game:
 
         # Insert it at the new position
         player.hand.insert(new_index, card_to_move)
+        self.touch(f"hand:{user_id}")
 
         logger.debug(f"New hand order: {[(c.suit, c.rank) for c in player.hand]}")
 
-    def update_score_card(self):
-        self.score_card[self.round_number] = [
-            player.score or 0 for player in self.players.values()
+    def score_all_hands(self) -> dict[str, int]:
+        """Score every player's current hand in one batch."""
+        players = list(self.players.values())
+        results = score_cache.solve_many(
+            [player.hand for player in players],
+            self.round_number,
+            [player.evaluator for player in players],
+        )
+        for player, result in zip(players, results):
+            player.score = result.get("score", 0)
+        return {player.id: player.score for player in players}
+
+    def hands_to_score(self, user_id: str, action_name: str = "") -> list[list[Card]]:
+        """Hands the pending action for `user_id` will score.
+
+        Only going out scores: a Go_out action, or a discard on the last turn
+        of the round or that leaves a hand that can go out. Then every hand is
+        scored, with the acting player's hand as it is after the discard.
+        Picks and sorts score nothing.
+        """
+        player = self.player(user_id)
+        if not player:
+            return []
+        if action_name == "Go_out":
+            return [other.hand for other in self.players.values()]
+        if self.card_to_exchange not in player.hand:
+            return []
+        after_discard = player.hand.copy()
+        after_discard.remove(self.card_to_exchange)
+        if not self.last_turn_in_round and not score_cache.can_go_out(
+            after_discard, self.round_number
+        ):
+            return []
+        return [
+            after_discard if other is player else other.hand
+            for other in self.players.values()
         ]
-        self.total_score_card()
+
+    def update_score_card(self):
+        self.score_all_hands()
+        row = self.score_card[self.round_number]
+        for seat, player in enumerate(self.seats):
+            score = player.score or 0
+            # Apply only the change, so rescoring a round does not count it twice
+            self.score_totals[seat] += score - row[seat]
+            row[seat] = score
+            player.total_score = self.score_totals[seat]
+        self.touch("score", "out_cards")
 
     def total_score_card(self):
         if not self.score_card:
             return
-        score_card_total = []
-        for player in self.players.values():
-            player.total_score = 0
-        for round in range(MIN_ROUND, MAX_ROUND + 1):
-            for player_num, player in enumerate(self.players.values()):
-                player.total_score += self.score_card[round][player_num]
-        score_card_total = [player.total_score for player in self.players.values()]
-        return score_card_total
+        return list(self.score_totals)
 
     def round_wild(self):
         if self.is_game_over():  #######################################TODO
@@ -875,7 +988,7 @@ def main():
     ids = [("1", "Lee"), ("2", "Adina")]
     game = Game()
     for player_id, player_name in ids:
-        game.players[player_id] = Player(player_id, player_name)
+        game.add_player(player_id, player_name)
     game.wait()
     print(game.actions)
     game.start_game()
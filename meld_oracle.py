@@ -0,0 +1,249 @@
+"""Brute-force reference solver and differential fuzzing for meld solvers.
+
+The oracle knows nothing about packed counts, candidate tables or search
+order. It works on plain card descriptions and tries every way to put the
+first remaining card into a valid group or leave it over, so it is slow but
+easy to check against the rules:
+
+    book  three or more cards of one rank, any suits
+    run   three or more cards of one suit in consecutive ranks (at most 11)
+    wilds jokers and the round's rank stand in for any card of either
+
+Leftover cards cost their rank, round wilds 20 and jokers 50.
+
+Usage:
+    python meld_oracle.py --hands 100000            fuzz every round
+    python meld_oracle.py --round 13 --seed 7       one round, another corpus
+    python meld_oracle.py --engine anytime          another registered engine
+    python meld_oracle.py --hands 1000000 --workers 8
+"""
+
+import argparse
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+import meld_solver
+import solver_registry
+from five_crowns import Card, Deck, MAX_ROUND, MIN_ROUND
+
+JOKER = "joker"
+ROUND_WILD = "wild"
+PENALTY = {JOKER: meld_solver.JOKER_PENALTY, ROUND_WILD: meld_solver.ROUND_WILD_PENALTY}
+SUIT_INDEX = meld_solver.SUIT_INDEX
+
+# Solver under test: (hand, round) -> minimal leftover score
+Solver = Callable[[list[Card], int], int]
+
+
+def describe(card: Card, round_num: int) -> tuple:
+    """("joker",), ("wild",) or (suit, rank) for a natural card."""
+    if meld_solver.is_joker(card):
+        return (JOKER,)
+    if card.rank == round_num:
+        return (ROUND_WILD,)
+    return (card.suit.value, card.rank)
+
+
+def penalty(kind: tuple) -> int:
+    return PENALTY[kind[0]] if len(kind) == 1 else kind[1]
+
+
+def is_group(kinds: list[tuple]) -> bool:
+    """True when the cards form a complete book or run."""
+    return len(kinds) >= 3 and _could_grow(kinds)
+
+
+def _could_grow(kinds: list[tuple]) -> bool:
+    """True when the cards are a book or run, ignoring the three-card minimum."""
+    naturals = [kind for kind in kinds if len(kind) == 2]
+    if len({rank for _, rank in naturals}) <= 1:
+        return True
+    if len({suit for suit, _ in naturals}) > 1:
+        return False
+    ranks = [rank for _, rank in naturals]
+    if len(set(ranks)) < len(ranks):
+        return False
+    return max(ranks) - min(ranks) < len(kinds) <= meld_solver.NUM_RANKS
+
+
+def _could_extend(kinds: list[tuple]) -> bool:
+    """True when more cards might still turn the cards into a group."""
+    naturals = [kind for kind in kinds if len(kind) == 2]
+    if len({rank for _, rank in naturals}) <= 1:
+        return True
+    if len({suit for suit, _ in naturals}) > 1:
+        return False
+    ranks = [rank for _, rank in naturals]
+    return len(set(ranks)) == len(ranks) and max(ranks) - min(ranks) < meld_solver.NUM_RANKS
+
+
+def _groups_with_first(cards: tuple) -> set[tuple]:
+    """Index sets of every group containing cards[0], one per distinct group."""
+    found = {}
+    stack = [((0,), [cards[0]])]
+    while stack:
+        indexes, kinds = stack.pop()
+        if is_group(kinds):
+            found.setdefault(tuple(sorted(kinds)), indexes)
+        for i in range(indexes[-1] + 1, len(cards)):
+            grown = kinds + [cards[i]]
+            if _could_extend(grown):
+                stack.append((indexes + (i,), grown))
+    return set(found.values())
+
+
+def score_kinds(cards: tuple, memo: dict | None = None) -> int:
+    """Minimal leftover score of a sorted tuple of card descriptions.
+
+    `memo` maps each tuple reached to (score, group cards or None).
+    """
+    if not cards:
+        return 0
+    memo = {} if memo is None else memo
+    found = memo.get(cards)
+    if found is not None:
+        return found[0]
+    best = penalty(cards[0]) + score_kinds(cards[1:], memo)
+    choice = None
+    for indexes in _groups_with_first(cards):
+        rest = tuple(card for i, card in enumerate(cards) if i not in indexes)
+        score = score_kinds(rest, memo)
+        if score < best:
+            best = score
+            choice = tuple(cards[i] for i in indexes)
+    memo[cards] = (best, choice)
+    return best
+
+
+def score_hand(hand: list[Card], round_num: int) -> int:
+    """Minimal leftover score of `hand` in round `round_num`."""
+    return score_kinds(tuple(sorted(describe(card, round_num) for card in hand)))
+
+
+def solve_packed(counts: int, jokers: int, round_wilds: int) -> tuple:
+    """Solve a packed hand; same result shape as meld_solver.solve_packed."""
+    cards = [(JOKER,)] * jokers + [(ROUND_WILD,)] * round_wilds
+    for cell, count in meld_solver._mask_cells(counts):
+        suit_index, offset = divmod(cell, meld_solver.NUM_RANKS)
+        suit = meld_solver.SUIT_ORDER[suit_index]
+        cards += [(suit, offset + meld_solver.MIN_RANK)] * count
+    cards = tuple(sorted(cards))
+    memo: dict = {}
+    score = score_kinds(cards, memo)
+
+    groups = []
+    while cards:
+        _, choice = memo[cards]
+        if choice is None:
+            cards = cards[1:]
+            continue
+        rest = list(cards)
+        for card in choice:
+            rest.remove(card)
+        cards = tuple(rest)
+        naturals = [card for card in choice if len(card) == 2]
+        cells = [meld_solver.cell_index(SUIT_INDEX[suit], rank) for suit, rank in naturals]
+        mask = sum(meld_solver.CELL_UNIT[cell] for cell in cells)
+        kind = "book" if len({rank for _, rank in naturals}) <= 1 else "run"
+        groups.append((kind, mask, len(choice) - len(naturals)))
+    return score, tuple(groups)
+
+
+def solver_for(engine: str) -> Solver:
+    """A Solver that runs a registered engine and lays the result out on the hand."""
+
+    def solve(hand: list[Card], round_num: int) -> int:
+        solution = solver_registry.run_engine(
+            engine, *meld_solver.pack_hand(hand, round_num)
+        )
+        return meld_solver.layout_hand(hand, round_num, solution)["score"]
+
+    return solve
+
+
+def mismatch(solver: Solver, hand: list[Card], round_num: int) -> tuple[int, int] | None:
+    """(solver score, oracle score) when they disagree, otherwise None."""
+    expected = score_hand(hand, round_num)
+    actual = solver(hand, round_num)
+    return None if actual == expected else (actual, expected)
+
+
+def shrink(solver: Solver, hand: list[Card], round_num: int) -> list[Card]:
+    """Drop cards one at a time while the solver still disagrees with the oracle."""
+    hand = list(hand)
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for i in range(len(hand)):
+            smaller = hand[:i] + hand[i + 1 :]
+            if mismatch(solver, smaller, round_num):
+                hand = smaller
+                shrunk = True
+                break
+    return hand
+
+
+def fuzz(
+    solver: Solver,
+    round_num: int,
+    hands: int,
+    rng: random.Random,
+) -> list[Card] | None:
+    """Check `hands` random deals; return a shrunk counterexample if any."""
+    cards = Deck().cards
+    for _ in range(hands):
+        size = round_num + rng.randint(0, 1)  # with and without the drawn card
+        hand = rng.sample(cards, size)
+        if mismatch(solver, hand, round_num):
+            return shrink(solver, hand, round_num)
+    return None
+
+
+def _fuzz_chunk(
+    engine: str, round_num: int, hands: int, seed: int
+) -> list[Card] | None:
+    """fuzz() for one worker process."""
+    return fuzz(solver_for(engine), round_num, hands, random.Random(seed))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--engine", choices=sorted(solver_registry.ENGINES), default="count"
+    )
+    parser.add_argument("--round", type=int, help="fuzz only this round")
+    parser.add_argument("--hands", type=int, default=1000, help="hands per round")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    solver = solver_for(args.engine)
+    rounds = [args.round] if args.round else range(MIN_ROUND, MAX_ROUND + 1)
+    # Every worker gets its own share of the hands and its own seed
+    shares = [args.hands // args.workers] * args.workers
+    shares[0] += args.hands % args.workers
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for round_num in rounds:
+            seeds = [hash((args.seed, round_num, worker)) for worker in range(args.workers)]
+            results = executor.map(
+                _fuzz_chunk,
+                [args.engine] * args.workers,
+                [round_num] * args.workers,
+                shares,
+                seeds,
+            )
+            counterexample = next((hand for hand in results if hand is not None), None)
+            if counterexample is None:
+                print(f"round {round_num}: {args.hands} hands agree")
+                continue
+            actual, expected = mismatch(solver, counterexample, round_num)
+            cards = " ".join(f"{card.rank}{card.suit.value}" for card in counterexample)
+            print(f"round {round_num}: {cards} scored {actual}, oracle {expected}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,598 @@
+"""Count-matrix meld solver for Five Crowns hands.
+
+A hand is reduced to a 5-suit x 11-rank matrix of natural card counts plus a
+number of wild cards (jokers and the round's wild rank).  The matrix is packed
+into a single integer with CELL_BITS bits per (suit, rank) cell so candidate
+books and runs are plain integer masks that can be subtracted from it.
+
+The search always extends the lowest occupied cell: that card is either left
+over or becomes the lowest card of a book or run.  Every arrangement is
+therefore generated once, and duplicate cards from the double deck as well as
+interchangeable wilds are handled as counts rather than identities.
+"""
+
+import time
+
+import meld_tables
+
+MIN_RANK = 3
+MAX_RANK = 13
+NUM_RANKS = MAX_RANK - MIN_RANK + 1
+JOKER_RANK = 99
+SUIT_ORDER = ("heart", "spade", "club", "diamond", "star")
+NUM_SUITS = len(SUIT_ORDER)
+SUIT_INDEX = {suit: index for index, suit in enumerate(SUIT_ORDER)}
+
+JOKER_PENALTY = 50
+ROUND_WILD_PENALTY = 20
+
+CELL_BITS = 4
+CELL_MASK = (1 << CELL_BITS) - 1
+# Leftover wilds beyond this many always form their own book
+MAX_ABSORB = 2
+# A MeldSearch memo is dropped once it grows past this many states
+MAX_MEMO_STATES = 200_000
+
+# One unit in each (suit, rank) cell of the packed count matrix
+CELL_UNIT = [1 << (CELL_BITS * cell) for cell in range(NUM_SUITS * NUM_RANKS)]
+
+# Card codes: a natural card's code is its cell index, jokers come after them
+JOKER_CODE = NUM_SUITS * NUM_RANKS
+
+
+def cell_index(suit_index: int, rank: int) -> int:
+    return suit_index * NUM_RANKS + rank - MIN_RANK
+
+
+def is_joker(card) -> bool:
+    return card.code == JOKER_CODE
+
+
+def pack_hand(hand, round_num: int) -> tuple[int, int, int]:
+    """Return (packed natural counts, joker count, round wild count)."""
+    return pack_codes([card.code for card in hand], round_num)
+
+
+def pack_codes(codes, round_num: int) -> tuple[int, int, int]:
+    """pack_hand for a hand given as card codes."""
+    counts = 0
+    jokers = 0
+    round_wilds = 0
+    for code in codes:
+        if code == JOKER_CODE:
+            jokers += 1
+        elif code % NUM_RANKS + MIN_RANK == round_num:
+            round_wilds += 1
+        else:
+            counts += CELL_UNIT[code]
+    return counts, jokers, round_wilds
+
+
+def cell_count(counts: int, cell: int) -> int:
+    return (counts >> (CELL_BITS * cell)) & CELL_MASK
+
+
+def _book_candidates(counts: int, suit_index: int, rank: int, wilds: int):
+    """Return (mask, size) for books of `rank` whose lowest suit is `suit_index`."""
+    cells = []
+    total = 0
+    for other in range(suit_index, NUM_SUITS):
+        cell = cell_index(other, rank)
+        available = cell_count(counts, cell)
+        if available:
+            cells.append((CELL_UNIT[cell], available))
+            total += available
+    if total + wilds < 3:
+        return []
+    unit, available = cells[0]
+    partial = [(n * unit, n) for n in range(1, available + 1)]
+    for unit, available in cells[1:]:
+        partial = [
+            (mask + n * unit, size + n)
+            for mask, size in partial
+            for n in range(available + 1)
+        ]
+    return [(mask, size) for mask, size in partial if size + wilds >= 3]
+
+
+def _run_candidates(counts: int, suit_index: int, rank: int, wilds: int):
+    """Return (mask, need, capacity) for runs whose lowest natural is (suit, rank)."""
+    offset = rank - MIN_RANK
+    above = meld_tables.row_presence(counts, suit_index) >> (offset + 1)
+    spread = meld_tables.SPREAD[suit_index]
+    return [
+        (spread[rank_bits], need, extra)
+        for rank_bits, need, extra in meld_tables.run_shapes(
+            offset, above, min(wilds, NUM_RANKS)
+        )
+    ]
+
+
+def _mask_cells(mask: int):
+    """Yield (cell, count) for every occupied cell of a packed mask."""
+    while mask:
+        low_bit = (mask & -mask).bit_length() - 1
+        cell = low_bit // CELL_BITS
+        count = cell_count(mask, cell)
+        yield cell, count
+        mask -= count * CELL_UNIT[cell]
+
+
+def _leftover_penalty(jokers: int, round_wilds: int, capacity: int) -> int:
+    wilds = jokers + round_wilds
+    if wilds == 0 or wilds > MAX_ABSORB:
+        return 0
+    # Absorbed wilds are jokers first, so leftover wilds are round wilds first
+    left = max(0, wilds - capacity)
+    as_round = min(left, round_wilds)
+    return as_round * ROUND_WILD_PENALTY + (left - as_round) * JOKER_PENALTY
+
+
+def _finish_groups(groups: list[list], spare_wilds: int) -> tuple:
+    """Place spare wilds: their own book, else on books, else on runs with room."""
+    if spare_wilds > MAX_ABSORB:
+        groups.append(["book", 0, spare_wilds])
+        spare_wilds = 0
+    for group in sorted(groups, key=lambda group: group[0] != "book"):
+        if not spare_wilds:
+            break
+        if group[0] == "book":
+            room = spare_wilds
+        else:
+            naturals = sum(count for _, count in _mask_cells(group[1]))
+            room = NUM_RANKS - naturals - group[2]
+        added = min(room, spare_wilds)
+        group[2] += added
+        spare_wilds -= added
+    return tuple(tuple(group) for group in groups)
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class MeldSearch:
+    """Memoized minimal-penalty search over packed hands.
+
+    States are (counts, jokers, round wilds, capacity) and wilds are always
+    spent jokers first, so a state's value does not depend on the hand it was
+    reached from. One instance can therefore keep its memo across many hands,
+    e.g. the successive hands of a player during a round.
+    """
+
+    CHECK_EVERY = 256
+
+    def __init__(self, max_states: int = MAX_MEMO_STATES) -> None:
+        self.max_states = max_states
+        self.memo: dict[tuple[int, int, int, int], tuple[int, tuple | None]] = {}
+        self.deadline: float | None = None
+        self.nodes = 0
+
+    def best(self, counts: int, jokers: int, round_wilds: int, capacity: int) -> int:
+        key = (counts, jokers, round_wilds, capacity)
+        found = self.memo.get(key)
+        if found is not None:
+            return found[0]
+        if not counts:
+            value = _leftover_penalty(jokers, round_wilds, capacity)
+            self.memo[key] = (value, None)
+            return value
+        if self.deadline is not None:
+            self.nodes += 1
+            if self.nodes % self.CHECK_EVERY == 0 and time.perf_counter() > self.deadline:
+                raise _OutOfTime
+
+        low_bit = (counts & -counts).bit_length() - 1
+        cell = low_bit // CELL_BITS
+        suit_index, rank = divmod(cell, NUM_RANKS)
+        rank += MIN_RANK
+        unit = CELL_UNIT[cell]
+        wilds = jokers + round_wilds
+
+        next_key = (counts - unit, jokers, round_wilds, capacity)
+        best_value = rank + self.best(*next_key)
+        best_choice: tuple = ("leave", unit, 0, next_key)
+
+        for mask, size in _book_candidates(counts, suit_index, rank, wilds):
+            need = max(0, 3 - size)
+            spent = min(jokers, need)
+            next_key = (
+                counts - mask,
+                jokers - spent,
+                round_wilds - need + spent,
+                MAX_ABSORB,
+            )
+            value = self.best(*next_key)
+            if value < best_value:
+                best_value = value
+                best_choice = ("book", mask, need, next_key)
+                if not value:
+                    break
+
+        if best_value:
+            for mask, need, extra in _run_candidates(counts, suit_index, rank, wilds):
+                spent = min(jokers, need)
+                next_key = (
+                    counts - mask,
+                    jokers - spent,
+                    round_wilds - need + spent,
+                    min(MAX_ABSORB, capacity + extra),
+                )
+                value = self.best(*next_key)
+                if value < best_value:
+                    best_value = value
+                    best_choice = ("run", mask, need, next_key)
+                    if not value:
+                        break
+
+        self.memo[key] = (best_value, best_choice)
+        return best_value
+
+    def score(self, counts: int, jokers: int, round_wilds: int) -> int:
+        """Minimal score of a packed hand, without recovering the groups."""
+        if len(self.memo) > self.max_states:
+            self.memo.clear()
+        return self.best(counts, jokers, round_wilds, 0)
+
+    def score_by(
+        self, counts: int, jokers: int, round_wilds: int, deadline: float
+    ) -> int | None:
+        """Like score, but None if `deadline` passes first.
+
+        Only finished states are memoized, so the work done before the
+        deadline is kept for the next call.
+        """
+        self.deadline = deadline
+        try:
+            return self.score(counts, jokers, round_wilds)
+        except _OutOfTime:
+            return None
+        finally:
+            self.deadline = None
+
+    def solve(self, counts: int, jokers: int, round_wilds: int) -> tuple:
+        """Solve a packed hand.
+
+        Returns (score, groups) where groups is a tuple of (kind, mask, wilds)
+        and every wild that is not left over has been placed in a group.
+        """
+        score = self.score(counts, jokers, round_wilds)
+        key = (counts, jokers, round_wilds, 0)
+
+        # Replay the chosen groups from the memo
+        groups = []
+        while True:
+            _, choice = self.memo[key]
+            if choice is None:
+                break
+            kind, mask, need, key = choice
+            if kind != "leave":
+                groups.append([kind, mask, need])
+        spare_wilds = key[1] + key[2]
+
+        return score, _finish_groups(groups, spare_wilds)
+
+
+class AnytimeSearch:
+    """Branch-and-bound search that gives up at a deadline.
+
+    Choices are tried best-first (most penalty covered, then fewest wilds, and
+    leaving the card last), so the first complete descent is a greedy
+    arrangement. Later leaves replace it only when they score lower, and a
+    state reached again with no lower penalty is skipped. `proven` is True
+    when the tree was exhausted before the deadline.
+    """
+
+    CHECK_EVERY = 256
+
+    def __init__(self, deadline: float) -> None:
+        self.deadline = deadline
+        self.nodes = 0
+        self.reached: dict[tuple[int, int, int, int], int] = {}
+        self.best_score: int | None = None
+        self.best_path: tuple = ()
+        self.best_spare = 0
+
+    def solve(self, counts: int, jokers: int, round_wilds: int) -> tuple[tuple, bool]:
+        """Return (solution, proven) in the same shape as MeldSearch.solve."""
+        try:
+            self._descend((counts, jokers, round_wilds, 0), 0, [])
+            proven = True
+        except _OutOfTime:
+            proven = False
+        groups = [list(group) for group in self.best_path]
+        return (self.best_score, _finish_groups(groups, self.best_spare)), proven
+
+    def _descend(self, key: tuple[int, int, int, int], penalty: int, path: list) -> None:
+        self.nodes += 1
+        if self.best_score is not None:
+            if penalty >= self.best_score:
+                return
+            if self.nodes % self.CHECK_EVERY == 0 and time.perf_counter() > self.deadline:
+                raise _OutOfTime
+        reached = self.reached.get(key)
+        if reached is not None and reached <= penalty:
+            return
+        self.reached[key] = penalty
+
+        counts, jokers, round_wilds, capacity = key
+        if not counts:
+            total = penalty + _leftover_penalty(jokers, round_wilds, capacity)
+            if self.best_score is None or total < self.best_score:
+                self.best_score = total
+                self.best_path = tuple(path)
+                self.best_spare = jokers + round_wilds
+            return
+
+        low_bit = (counts & -counts).bit_length() - 1
+        cell = low_bit // CELL_BITS
+        suit_index, rank = divmod(cell, NUM_RANKS)
+        rank += MIN_RANK
+        wilds = jokers + round_wilds
+
+        options = []
+        for mask, size in _book_candidates(counts, suit_index, rank, wilds):
+            need = max(0, 3 - size)
+            options.append((rank * size, -need, "book", mask, MAX_ABSORB))
+        for mask, need, extra in _run_candidates(counts, suit_index, rank, wilds):
+            covered = sum(
+                (cell % NUM_RANKS + MIN_RANK) * count for cell, count in _mask_cells(mask)
+            )
+            options.append((covered, -need, "run", mask, min(MAX_ABSORB, capacity + extra)))
+        options.sort(key=lambda option: option[:2], reverse=True)
+
+        for _, negative_need, kind, mask, next_capacity in options:
+            need = -negative_need
+            spent = min(jokers, need)
+            path.append((kind, mask, need))
+            self._descend(
+                (counts - mask, jokers - spent, round_wilds - need + spent, next_capacity),
+                penalty,
+                path,
+            )
+            path.pop()
+
+        unit = CELL_UNIT[cell]
+        self._descend((counts - unit, jokers, round_wilds, capacity), penalty + rank, path)
+
+
+def solve_packed(counts: int, jokers: int, round_wilds: int) -> tuple:
+    """Solve a packed hand with a fresh search; see MeldSearch.solve."""
+    return MeldSearch().solve(counts, jokers, round_wilds)
+
+
+def solve_bounded(
+    counts: int, jokers: int, round_wilds: int, budget: float
+) -> tuple[tuple, bool]:
+    """Best solution found within `budget` seconds, and whether it is proven optimal."""
+    search = AnytimeSearch(time.perf_counter() + budget)
+    return search.solve(counts, jokers, round_wilds)
+
+
+def _cover_possible(counts: int, wilds: int) -> bool:
+    """Cheap necessary conditions for melding every card of a packed hand.
+
+    Each natural card needs either enough cards of its rank (plus wilds) for a
+    book, or a three-rank window of its suit that wilds can complete.
+    """
+    for cell, _ in _mask_cells(counts):
+        suit_index, offset = divmod(cell, NUM_RANKS)
+        rank = offset + MIN_RANK
+        same_rank = sum(
+            cell_count(counts, cell_index(other, rank)) for other in range(NUM_SUITS)
+        )
+        if same_rank + wilds >= 3:
+            continue
+        for start in range(max(MIN_RANK, rank - 2), min(rank, MAX_RANK - 2) + 1):
+            present = sum(
+                1
+                for window_rank in range(start, start + 3)
+                if cell_count(counts, cell_index(suit_index, window_rank))
+            )
+            if 3 - present <= wilds:
+                break
+        else:
+            return False
+    return True
+
+
+def can_cover(counts: int, jokers: int, round_wilds: int) -> bool:
+    """True when every card of a packed hand can be melded (score 0).
+
+    Unlike MeldSearch this never leaves a card over, stops at the first
+    complete cover, and only remembers states that failed.
+    """
+    wilds = jokers + round_wilds
+    if not _cover_possible(counts, wilds):
+        return False
+    failed: set[tuple[int, int, int]] = set()
+
+    def cover(counts: int, wilds: int, capacity: int) -> bool:
+        if not counts:
+            return wilds == 0 or wilds > MAX_ABSORB or wilds <= capacity
+        key = (counts, wilds, capacity)
+        if key in failed:
+            return False
+        low_bit = (counts & -counts).bit_length() - 1
+        cell = low_bit // CELL_BITS
+        suit_index, rank = divmod(cell, NUM_RANKS)
+        rank += MIN_RANK
+        for mask, size in _book_candidates(counts, suit_index, rank, wilds):
+            if cover(counts - mask, wilds - max(0, 3 - size), MAX_ABSORB):
+                return True
+        for mask, need, extra in _run_candidates(counts, suit_index, rank, wilds):
+            if cover(counts - mask, wilds - need, min(MAX_ABSORB, capacity + extra)):
+                return True
+        failed.add(key)
+        return False
+
+    return cover(counts, wilds, 0)
+
+
+class HandEvaluator:
+    """Packed view of one player's hand, updated a card at a time.
+
+    The packed counts follow draws and discards without rescanning the hand,
+    and the MeldSearch memo is kept for the whole round so each re-score only
+    explores states that the previous hands did not reach.
+    """
+
+    def __init__(self) -> None:
+        self.round_num: int | None = None
+        self.size = 0
+        self.counts = 0
+        self.jokers = 0
+        self.round_wilds = 0
+        self.search = MeldSearch()
+
+    def reset(self) -> None:
+        """Forget the hand and the memo, e.g. at the start of a round."""
+        self.invalidate()
+        self.search = MeldSearch()
+
+    def invalidate(self) -> None:
+        """Mark the packed hand stale so the next lookup repacks it."""
+        self.round_num = None
+
+    def sync(self, hand, round_num: int) -> None:
+        self.counts, self.jokers, self.round_wilds = pack_hand(hand, round_num)
+        self.size = len(hand)
+        self.round_num = round_num
+
+    def add(self, card) -> None:
+        self._update(card, 1)
+
+    def remove(self, card) -> None:
+        self._update(card, -1)
+
+    def _update(self, card, step: int) -> None:
+        if self.round_num is None:
+            return
+        self.size += step
+        if is_joker(card):
+            self.jokers += step
+        elif card.rank == self.round_num:
+            self.round_wilds += step
+        else:
+            self.counts += step * CELL_UNIT[card.code]
+
+    def packed(self, hand, round_num: int) -> tuple[int, int, int]:
+        """Return the packed hand, repacking only if it is stale."""
+        if round_num != self.round_num or self.size != len(hand):
+            self.sync(hand, round_num)
+        return self.counts, self.jokers, self.round_wilds
+
+    def discard_scores(
+        self, hand, round_num: int, budget: float | None = None
+    ) -> list[int]:
+        """Score left after discarding each card of `hand`, in hand order.
+
+        All leave-one-out hands share this evaluator's memo, and identical
+        cards are only scored once. With a budget (seconds) the hands share
+        the memo until the deadline; any left unfinished then get
+        AnytimeSearch's first arrangement, which may be above optimal.
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        counts, jokers, round_wilds = self.packed(hand, round_num)
+        scores_by_hand: dict[tuple[int, int, int], int] = {}
+        scores = []
+        for card in hand:
+            if is_joker(card):
+                remaining = (counts, jokers - 1, round_wilds)
+            elif card.rank == round_num:
+                remaining = (counts, jokers, round_wilds - 1)
+            else:
+                remaining = (counts - CELL_UNIT[card.code], jokers, round_wilds)
+            if remaining in scores_by_hand:
+                pass
+            elif deadline is None:
+                scores_by_hand[remaining] = self.search.score(*remaining)
+            else:
+                score = self.search.score_by(*remaining, deadline)
+                if score is None:
+                    (score, _), _ = AnytimeSearch(deadline).solve(*remaining)
+                scores_by_hand[remaining] = score
+            scores.append(scores_by_hand[remaining])
+        return scores
+
+
+def layout_hand(hand, round_num: int, solution: tuple) -> dict:
+    """Map a packed solution back onto the cards of `hand`."""
+    score, groups = solution
+
+    # Hand positions per cell, and wild positions with jokers spent first
+    positions: dict[int, list[int]] = {}
+    joker_positions, round_wild_positions = [], []
+    for index, card in enumerate(hand):
+        if is_joker(card):
+            joker_positions.append(index)
+        elif card.rank == round_num:
+            round_wild_positions.append(index)
+        else:
+            positions.setdefault(card.code, []).append(index)
+    wild_positions = joker_positions + round_wild_positions
+
+    books, runs, assigned_wilds = [], [], []
+    used: set[int] = set()
+    for kind, mask, need in groups:
+        naturals = []
+        for cell, count in _mask_cells(mask):
+            naturals.extend(positions[cell][:count])
+            del positions[cell][:count]
+        wild_ids = wild_positions[:need]
+        del wild_positions[:need]
+        ranks = [hand[index].rank for index in naturals]
+        if kind == "book":
+            rank = ranks[0] if ranks else MIN_RANK
+            slots = [(rank, None)] * need
+            sort_key = (rank,)
+        else:
+            suit = hand[naturals[0]].suit
+            slots = [(rank, suit) for rank in _run_wild_ranks(ranks, need)]
+            sort_key = (SUIT_INDEX[suit.value], min(ranks))
+        ids = sorted(naturals + wild_ids)
+        used.update(ids)
+        (books if kind == "book" else runs).append(
+            (sort_key, [hand[index] for index in ids])
+        )
+        for wid, (as_rank, as_suit) in zip(wild_ids, slots):
+            assigned_wilds.append(
+                {
+                    "card": hand[wid],
+                    "assigned_rank": as_rank,
+                    "assigned_suit": as_suit,
+                    "used_for": kind,
+                }
+            )
+
+    return {
+        "books": [cards for _, cards in sorted(books, key=lambda group: group[0])],
+        "runs": [cards for _, cards in sorted(runs, key=lambda group: group[0])],
+        "assigned_wilds": assigned_wilds,
+        "remaining": [card for index, card in enumerate(hand) if index not in used],
+        "score": score,
+    }
+
+
+def solve_hand(hand, round_num: int) -> dict:
+    """
+    hand: list[Card]
+    round_num: int (3..13)
+
+    Returns dict with books, runs, assigned wilds, remaining, score.
+    """
+    return layout_hand(hand, round_num, solve_packed(*pack_hand(hand, round_num)))
+
+
+def _run_wild_ranks(ranks: list[int], wilds: int) -> list[int]:
+    """Ranks filled by `wilds` wild cards in a run over the given natural ranks."""
+    present = set(ranks)
+    low, high = min(ranks), max(ranks)
+    filled = [rank for rank in range(low, high + 1) if rank not in present]
+    while len(filled) < wilds and high < MAX_RANK:
+        high += 1
+        filled.append(high)
+    while len(filled) < wilds and low > MIN_RANK:
+        low -= 1
+        filled.append(low)
+    return filled[:wilds]
@@ -0,0 +1,92 @@
+"""Candidate-group tables for the meld solver.
+
+Every run is fixed by its lowest natural rank, the set of natural ranks it
+uses above that, and therefore the wild slots it needs. These shapes do not
+depend on the suit or the round, so they are tabulated once and turned into
+packed masks by table lookup.
+
+Built at import:
+
+    SPREAD[suit][rank_bits]  packed mask with one card on each rank in rank_bits
+    PRESENCE16[nibbles]      which of four packed cells are non-empty
+
+Filled on first use and kept for the life of the process:
+
+    run_shapes(offset, above, wilds)  runs starting at `offset` given the
+                                      ranks present above it
+"""
+
+MIN_RANK = 3
+MAX_RANK = 13
+NUM_RANKS = MAX_RANK - MIN_RANK + 1
+NUM_SUITS = 5
+CELL_BITS = 4
+ROW_BITS = CELL_BITS * NUM_RANKS
+ROW_MASK = (1 << ROW_BITS) - 1
+
+
+def _spread(rank_bits: int) -> int:
+    mask = 0
+    offset = 0
+    while rank_bits:
+        if rank_bits & 1:
+            mask |= 1 << (CELL_BITS * offset)
+        rank_bits >>= 1
+        offset += 1
+    return mask
+
+
+_ROW_SPREAD = [_spread(rank_bits) for rank_bits in range(1 << NUM_RANKS)]
+SPREAD = [
+    [row << (ROW_BITS * suit) for row in _ROW_SPREAD] for suit in range(NUM_SUITS)
+]
+
+PRESENCE16 = [
+    sum(1 << nibble for nibble in range(4) if (value >> (CELL_BITS * nibble)) & 0xF)
+    for value in range(1 << 16)
+]
+
+
+def row_presence(counts: int, suit: int) -> int:
+    """Bit per rank offset that holds at least one card of `suit`."""
+    row = (counts >> (ROW_BITS * suit)) & ROW_MASK
+    return (
+        PRESENCE16[row & 0xFFFF]
+        | PRESENCE16[(row >> 16) & 0xFFFF] << 4
+        | PRESENCE16[row >> 32] << 8
+    )
+
+
+_RUN_SHAPES: dict[tuple[int, int, int], tuple[tuple[int, int, int], ...]] = {}
+
+
+def run_shapes(offset: int, above: int, wilds: int) -> tuple[tuple[int, int, int], ...]:
+    """Runs whose lowest natural is at rank offset `offset`.
+
+    `above` has a bit per rank offset greater than `offset` that is present
+    (bit 0 is offset + 1). Returns (rank_bits, need, extra) for every run
+    using at most `wilds` wilds, where rank_bits are the natural ranks used,
+    need is the wild slots required and extra is how many more wilds the run
+    could take.
+    """
+    key = (offset, above, wilds)
+    shapes = _RUN_SHAPES.get(key)
+    if shapes is None:
+        found = []
+        stack = [(offset, 1 << offset, 0)]
+        while stack:
+            top, rank_bits, gaps = stack.pop()
+            span = top - offset + 1
+            length = max(3, span)
+            found.append((rank_bits, gaps + length - span, NUM_RANKS - length))
+            for next_offset in range(top + 1, NUM_RANKS):
+                skipped = next_offset - top - 1
+                if gaps + skipped > wilds:
+                    break
+                if above >> (next_offset - offset - 1) & 1:
+                    stack.append(
+                        (next_offset, rank_bits | 1 << next_offset, gaps + skipped)
+                    )
+        shapes = tuple(shape for shape in found if shape[1] <= wilds)
+        _RUN_SHAPES[key] = shapes
+    return shapes
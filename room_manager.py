@@ -1,4 +1,5 @@
 # from fastapi import WebSocket, WebSocketDisconnect
+import asyncio
 from five_crowns import Game, GameStatus
 from connection_manager import ConnectionManager
 from loguru import logger
@@ -8,11 +9,15 @@ import uuid
 class Room:
     """Represents a single game room with its own game instance and connections."""
     
-    def __init__(self, room_id: str, room_name: str = "", max_players: int = 7):
+    def __init__(
+        self, room_id: str, room_name: str = "", max_players: int = 7, seed: int | None = None
+    ):
         self.room_id = room_id
         self.room_name = room_name or f"Room {room_id[:8]}"
-        self.game = Game()
+        self.game = Game(seed)
         self.manager = ConnectionManager(self.game, room_id, self.room_name)
+        # Held while a message changes the game, since solving can yield to the event loop
+        self.lock = asyncio.Lock()
         self.max_players = max_players
         self.created_at = None
         self.game.wait()
@@ -48,13 +53,15 @@ class RoomManager:
         self.default_max_players = default_max_players
         self.user_to_room: dict[str, str] = {}  # Maps user_id to room_id
     
-    def create_room(self, room_name: str = "", max_players: int | None = None) -> Room:
-        """Create a new room."""
+    def create_room(
+        self, room_name: str = "", max_players: int | None = None, seed: int | None = None
+    ) -> Room:
+        """Create a new room. Pass a seed to replay the deals of an earlier game."""
         room_id = str(uuid.uuid4())
         max_p = max_players or self.default_max_players
-        room = Room(room_id, room_name, max_p)
+        room = Room(room_id, room_name, max_p, seed)
         self.rooms[room_id] = room
-        logger.info(f"Created room {room_id} ({room_name})")
+        logger.info(f"Created room {room_id} ({room_name}) with seed {room.game.seed}")
         return room
     
     def get_room(self, room_id: str) -> Room | None:
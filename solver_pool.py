@@ -0,0 +1,114 @@
+"""Executor-backed hand solving so large hands never block the event loop."""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from dotenv import load_dotenv
+from loguru import logger
+
+import solver_registry
+from five_crowns import Card, HandScoreCache, score_cache
+from tablebase import tablebase
+
+try:  # Python 3.14+
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:
+    InterpreterPoolExecutor = None
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+def _init_worker(tablebase_path: str) -> None:
+    """Map the tablebase in each worker so the "table" engine works there too."""
+    tablebase.path = tablebase_path
+    tablebase.load()
+
+
+def _tablebase_loaded() -> bool:
+    return tablebase.loaded
+
+
+class SolverPool:
+    """Solves uncached hands in a worker pool and stores them in the score cache.
+
+    Game actions stay synchronous: process_message awaits prefetch() for the
+    hands an action may score, and the action itself then hits the cache.
+    Hands smaller than the offload threshold are cheap and left to be solved
+    inline.
+    """
+
+    def __init__(self):
+        self.kind = os.getenv("SOLVER_POOL", "process")  # process, interpreter or off
+        self.workers = int(os.getenv("SOLVER_POOL_WORKERS", "2"))
+        self.min_cards = int(os.getenv("SOLVER_OFFLOAD_MIN_CARDS", "10"))
+        self.executor: Executor | None = None
+
+        if self.kind == "interpreter" and InterpreterPoolExecutor is None:
+            logger.warning("InterpreterPoolExecutor needs Python 3.14, using processes")
+            self.kind = "process"
+        self.enabled = self.kind != "off"
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            options = {
+                "max_workers": self.workers,
+                "initializer": _init_worker,
+                "initargs": (tablebase.path,),
+            }
+            if self.kind == "interpreter":
+                self.executor = InterpreterPoolExecutor(**options)  # type: ignore
+            else:
+                self.executor = ProcessPoolExecutor(**options)
+            logger.info(f"Solver pool started: {self.kind} x {self.workers}")
+        return self.executor
+
+    async def prefetch(
+        self,
+        hands: list[list[Card]],
+        round_num: int,
+        cache: HandScoreCache = score_cache,
+    ) -> int:
+        """Solve large uncached hands off the event loop. Returns how many."""
+        if not self.enabled:
+            return 0
+        keys = []
+        engines = []
+        for hand in hands:
+            if len(hand) < self.min_cards:
+                continue
+            key = cache.key(hand, round_num)
+            if key not in cache and key not in keys:
+                keys.append(key)
+                engines.append(solver_registry.solver_registry.engine_for(len(hand)))
+        if not keys:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        try:
+            executor = self.get_executor()
+            solutions = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor, solver_registry.run_engine, engine, *key[1:]
+                    )
+                    for key, engine in zip(keys, engines)
+                )
+            )
+        except Exception as e:
+            # The action still solves inline on a cache miss
+            logger.error(f"Solver pool failed, solving inline: {e}")
+            return 0
+        for key, solution in zip(keys, solutions):
+            cache.put(key, solution)
+        return len(keys)
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+# Global solver pool instance
+solver_pool = SolverPool()
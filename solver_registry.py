@@ -0,0 +1,171 @@
+"""Meld solver engines and per-hand-size engine selection.
+
+An engine takes a packed hand (see meld_solver.pack_hand) and returns a
+solution (score, groups) for meld_solver.layout_hand. Engines that can reuse
+a MeldSearch memo accept it as `search`; the others ignore it.
+
+At startup calibrate() times every engine on sample hands of each size and
+routes that size to another engine only when it clearly beats the default
+and its scores match the reference oracle. Callers that pass a search memo
+keep an engine that uses it. SOLVER_ENGINE pins one engine for every size
+and skips calibration.
+"""
+
+import os
+import random
+import time
+from typing import Callable
+
+from dotenv import load_dotenv
+from loguru import logger
+
+import meld_solver
+from tablebase import tablebase
+
+# Load environment variables from .env file
+load_dotenv()
+
+Engine = Callable[..., tuple]
+
+DEFAULT_ENGINE = "count"
+MIN_HAND_SIZE = meld_solver.MIN_RANK
+# Hands hold one card more than the round while a player is exchanging
+MAX_HAND_SIZE = meld_solver.MAX_RANK + 1
+NUM_JOKERS = 6
+
+
+def _count_engine(counts: int, jokers: int, round_wilds: int, search=None) -> tuple:
+    return (search or meld_solver.MeldSearch()).solve(counts, jokers, round_wilds)
+
+
+def _anytime_engine(counts: int, jokers: int, round_wilds: int, search=None) -> tuple:
+    solution, _ = meld_solver.solve_bounded(counts, jokers, round_wilds, float("inf"))
+    return solution
+
+
+def _oracle_engine(counts: int, jokers: int, round_wilds: int, search=None) -> tuple:
+    import meld_oracle  # imports five_crowns, which imports this module
+
+    return meld_oracle.solve_packed(counts, jokers, round_wilds)
+
+
+def _table_engine(counts: int, jokers: int, round_wilds: int, search=None) -> tuple:
+    solution = tablebase.lookup(counts, jokers, round_wilds)
+    if solution is None:
+        return _count_engine(counts, jokers, round_wilds, search)
+    return solution
+
+
+ENGINES: dict[str, Engine] = {
+    "count": _count_engine,
+    "anytime": _anytime_engine,
+    "oracle": _oracle_engine,
+    "table": _table_engine,
+}
+# Engines that reuse the caller's MeldSearch memo
+SEARCH_ENGINES = {"count", "table"}
+# Scores are checked against this engine during calibration
+REFERENCE_ENGINE = "oracle"
+# Another engine replaces the default only when it takes less than this share of its time
+CALIBRATION_MARGIN = 0.8
+
+
+def register(name: str, engine: Engine, uses_search: bool = False) -> None:
+    """Add an engine; it takes part in the next calibration."""
+    ENGINES[name] = engine
+    if uses_search:
+        SEARCH_ENGINES.add(name)
+
+
+def run_engine(name: str, counts: int, jokers: int, round_wilds: int) -> tuple:
+    """Solve with the named engine; picklable entry point for worker pools."""
+    return ENGINES[name](counts, jokers, round_wilds)
+
+
+def sample_hand(rng: random.Random, size: int) -> tuple[int, int, int]:
+    """A random packed hand of `size` cards, played in the matching round."""
+    round_num = min(max(size, meld_solver.MIN_RANK), meld_solver.MAX_RANK)
+    deck = [
+        (suit_index, rank)
+        for suit_index in range(meld_solver.NUM_SUITS)
+        for rank in range(meld_solver.MIN_RANK, meld_solver.MAX_RANK + 1)
+    ] * 2 + [None] * NUM_JOKERS
+    counts = jokers = round_wilds = 0
+    for card in rng.sample(deck, size):
+        if card is None:
+            jokers += 1
+        elif card[1] == round_num:
+            round_wilds += 1
+        else:
+            counts += meld_solver.CELL_UNIT[meld_solver.cell_index(*card)]
+    return counts, jokers, round_wilds
+
+
+class SolverRegistry:
+    """Chooses the engine that solves hands of each size."""
+
+    def __init__(self):
+        self.pinned = os.getenv("SOLVER_ENGINE") or None
+        self.samples = int(os.getenv("SOLVER_CALIBRATION_SAMPLES", "20"))
+        self.by_size: dict[int, str] = {}
+        self.timings: dict[int, dict[str, float]] = {}
+
+        if self.pinned is not None and self.pinned not in ENGINES:
+            logger.warning(f"Unknown SOLVER_ENGINE {self.pinned}, using calibration")
+            self.pinned = None
+
+    def engine_for(self, size: int) -> str:
+        if self.pinned is not None:
+            return self.pinned
+        return self.by_size.get(size, DEFAULT_ENGINE)
+
+    def solve(
+        self,
+        counts: int,
+        jokers: int,
+        round_wilds: int,
+        size: int,
+        search: meld_solver.MeldSearch | None = None,
+    ) -> tuple:
+        """Solve a packed hand of `size` cards with the engine routed for that size."""
+        name = self.engine_for(size)
+        if search is not None and self.pinned is None and name not in SEARCH_ENGINES:
+            # A warm memo beats any cold solve, so keep using it
+            name = DEFAULT_ENGINE
+        return ENGINES[name](counts, jokers, round_wilds, search)
+
+    def calibrate(self, seed: int = 0) -> dict[int, str]:
+        """Time every engine per hand size and route each size to the fastest."""
+        if self.pinned is not None:
+            logger.info(f"Solver engine pinned to {self.pinned}")
+            return {}
+        rng = random.Random(seed)
+        for size in range(MIN_HAND_SIZE, MAX_HAND_SIZE + 1):
+            hands = [sample_hand(rng, size) for _ in range(self.samples)]
+            expected = [ENGINES[REFERENCE_ENGINE](*hand)[0] for hand in hands]
+            timings = {}
+            for name, engine in ENGINES.items():
+                # Best of three passes, so one-off table fills and jitter do not count
+                elapsed = float("inf")
+                for _ in range(3):
+                    start = time.perf_counter()
+                    scores = [engine(*hand)[0] for hand in hands]
+                    elapsed = min(elapsed, time.perf_counter() - start)
+                if scores != expected:
+                    logger.error(f"Solver engine {name} is wrong at {size} cards, skipped")
+                    continue
+                timings[name] = elapsed
+            self.timings[size] = timings
+            fastest = min(timings, key=lambda name: timings[name])
+            default = timings.get(DEFAULT_ENGINE, float("inf"))
+            # Small margins are noise and would change the routing between restarts
+            if timings[fastest] < default * CALIBRATION_MARGIN:
+                self.by_size[size] = fastest
+            else:
+                self.by_size[size] = DEFAULT_ENGINE
+        logger.info(f"Solver engines by hand size: {self.by_size}")
+        return dict(self.by_size)
+
+
+# Global solver registry instance
+solver_registry = SolverRegistry()
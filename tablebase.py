@@ -0,0 +1,266 @@
+"""Precomputed solutions for every small hand of the early rounds.
+
+A solution only depends on the packed natural counts and the two wild
+counts, and swapping whole suits does not change it. Hands are therefore
+stored once per suit-canonical form: suit rows sorted in descending order,
+so the fullest suit comes first.
+
+The build step enumerates every canonical hand that can be held in rounds
+MIN_ROUND..max_round (up to round + 1 cards while exchanging), solves it
+and writes a static hash table:
+
+    header   MAGIC, version, entry count, bucket count
+    offsets  uint32[buckets + 1]  first entry of each bucket
+    keys     uint64[entries]      canonical hand, grouped by bucket
+    values   uint32[entries]      score and up to two groups
+
+Lookups hash the canonical hand to its bucket and compare the one or two
+keys stored there. The file is memory-mapped; the app and each solver pool
+worker map it at startup, so they share its pages.
+
+Usage:
+    python tablebase.py                       build rounds 3-6
+    python tablebase.py --max-round 5 --output other.bin
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from bisect import bisect_right
+
+from dotenv import load_dotenv
+from loguru import logger
+
+import meld_solver
+
+# Load environment variables from .env file
+load_dotenv()
+
+MAGIC = b"FCTB"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+MIN_ROUND = meld_solver.MIN_RANK
+DEFAULT_MAX_ROUND = 6
+# Hands with more cards than this are never in the table
+MAX_CARDS = 7
+MAX_JOKERS = 6
+
+ROW_BITS = meld_solver.CELL_BITS * meld_solver.NUM_RANKS
+ROW_MASK = (1 << ROW_BITS) - 1
+CODE_BITS = 6
+WILD_BITS = 7  # 3 bits of jokers, 4 of round wilds
+SCORE_BITS = 9
+GROUP_BITS = 11  # run flag, 7 natural positions, 3 bits of wilds
+# At most two groups fit in a seven card hand: 9 + 2 * 11 bits per value
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _canonical(counts: int) -> tuple[list[int], list[int]]:
+    """Sorted card codes of the canonical hand, and its suit -> original suit."""
+    suits = range(meld_solver.NUM_SUITS)
+    rows = [(counts >> (ROW_BITS * suit)) & ROW_MASK for suit in suits]
+    order = sorted(suits, key=lambda suit: rows[suit], reverse=True)
+    codes = []
+    for suit, original in enumerate(order):
+        for cell, count in meld_solver._mask_cells(rows[original]):
+            codes += [suit * meld_solver.NUM_RANKS + cell] * count
+    return codes, order
+
+
+def _key(codes: list[int], jokers: int, round_wilds: int) -> int:
+    key = jokers | round_wilds << 3
+    for position, code in enumerate(codes):
+        key |= (code + 1) << (WILD_BITS + CODE_BITS * position)
+    return key
+
+
+def _bucket(key: int, bucket_bits: int) -> int:
+    return ((key * HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - bucket_bits)
+
+
+def _encode(solution: tuple, codes: list[int]) -> int:
+    """Pack a canonical-space solution as score plus group positions."""
+    score, groups = solution
+    value = score
+    used: set[int] = set()
+    for number, (kind, mask, wilds) in enumerate(groups):
+        positions = 0
+        for cell, count in meld_solver._mask_cells(mask):
+            for _ in range(count):
+                position = next(
+                    i for i, code in enumerate(codes) if code == cell and i not in used
+                )
+                used.add(position)
+                positions |= 1 << position
+        group = (kind == "run") | positions << 1 | wilds << 8
+        value |= group << (SCORE_BITS + GROUP_BITS * number)
+    return value
+
+
+def _decode(value: int, codes: list[int], order: list[int]) -> tuple:
+    """Unpack a stored solution onto the original suits."""
+    score = value & ((1 << SCORE_BITS) - 1)
+    groups = []
+    value >>= SCORE_BITS
+    while value:
+        group = value & ((1 << GROUP_BITS) - 1)
+        value >>= GROUP_BITS
+        mask = 0
+        for position, code in enumerate(codes):
+            if group >> (position + 1) & 1:
+                suit, cell = divmod(code, meld_solver.NUM_RANKS)
+                mask += meld_solver.CELL_UNIT[order[suit] * meld_solver.NUM_RANKS + cell]
+        groups.append(("run" if group & 1 else "book", mask, group >> 8))
+    return score, tuple(groups)
+
+
+def _suit_rows(round_num: int, max_cards: int) -> list[list[int]]:
+    """Packed suit rows without the round's wild rank, bucketed by card count."""
+    offsets = [rank - MIN_ROUND for rank in range(MIN_ROUND, meld_solver.MAX_RANK + 1)]
+    offsets.remove(round_num - MIN_ROUND)
+    rows: list[list[int]] = [[] for _ in range(max_cards + 1)]
+
+    def extend(index: int, row: int, size: int) -> None:
+        if index == len(offsets):
+            rows[size].append(row)
+            return
+        unit = 1 << (meld_solver.CELL_BITS * offsets[index])
+        for count in range(3):
+            if size + count <= max_cards:
+                extend(index + 1, row + count * unit, size + count)
+
+    extend(0, 0, 0)
+    return rows
+
+
+def _canonical_counts(round_num: int, max_cards: int):
+    """Yield (counts, natural count) for every suit-canonical set of naturals."""
+    rows_by_size = [sorted(rows) for rows in _suit_rows(round_num, max_cards)]
+
+    def extend(suit: int, limit: int, counts: int, size: int):
+        yield counts, size
+        if suit == meld_solver.NUM_SUITS:
+            return
+        # Each suit's row is no larger than the one before it
+        for row_size in range(1, max_cards - size + 1):
+            rows = rows_by_size[row_size]
+            for row in rows[: bisect_right(rows, limit)]:
+                yield from extend(
+                    suit + 1, row, counts | row << (ROW_BITS * suit), size + row_size
+                )
+
+    yield from extend(0, ROW_MASK, 0, 0)
+
+
+def build(path: str, max_round: int = DEFAULT_MAX_ROUND) -> int:
+    """Solve every canonical hand of rounds MIN_ROUND..max_round into `path`."""
+    search = meld_solver.MeldSearch()
+    entries: dict[int, int] = {}
+    for round_num in range(MIN_ROUND, max_round + 1):
+        max_cards = min(round_num + 1, MAX_CARDS)
+        for counts, naturals in _canonical_counts(round_num, max_cards):
+            codes, _ = _canonical(counts)
+            for jokers in range(min(MAX_JOKERS, max_cards - naturals) + 1):
+                for round_wilds in range(max_cards - naturals - jokers + 1):
+                    key = _key(codes, jokers, round_wilds)
+                    if key not in entries:
+                        solution = search.solve(counts, jokers, round_wilds)
+                        entries[key] = _encode(solution, codes)
+        logger.info(f"Tablebase round {round_num}: {len(entries)} hands")
+
+    # Two entries per bucket on average
+    bucket_bits = max(1, len(entries).bit_length() - 1)
+    buckets: list[list[int]] = [[] for _ in range(1 << bucket_bits)]
+    for key in entries:
+        buckets[_bucket(key, bucket_bits)].append(key)
+    offsets = [0]
+    keys = []
+    for bucket in buckets:
+        keys.extend(bucket)
+        offsets.append(len(keys))
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys), len(buckets)))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(struct.pack(f"<{len(keys)}Q", *keys))
+        f.write(struct.pack(f"<{len(keys)}I", *(entries[key] for key in keys)))
+    return len(keys)
+
+
+class Tablebase:
+    """Read-only view of a built tablebase file."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv("TABLEBASE_FILE", "meld_tablebase.bin")
+        self.loaded = False
+        self.entries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> bool:
+        """Map the file if it exists; lookups miss until it is loaded."""
+        if self.loaded:
+            return True
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, entries, buckets = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            logger.error(f"Tablebase {self.path} has an unknown format, not used")
+            self.map.close()
+            return False
+        view = memoryview(self.map)
+        start = HEADER.size
+        self.offsets = view[start : start + 4 * (buckets + 1)].cast("I")
+        start += 4 * (buckets + 1)
+        self.keys = view[start : start + 8 * entries].cast("Q")
+        start += 8 * entries
+        self.values = view[start : start + 4 * entries].cast("I")
+        self.entries = entries
+        self.bucket_bits = buckets.bit_length() - 1
+        self.loaded = True
+        logger.info(f"Tablebase loaded: {entries} hands from {self.path}")
+        return True
+
+    def lookup(self, counts: int, jokers: int, round_wilds: int) -> tuple | None:
+        """Solution of a packed hand, or None when it is not in the table."""
+        if not self.loaded or jokers > MAX_JOKERS:
+            return None
+        codes, order = _canonical(counts)
+        if len(codes) + jokers + round_wilds > MAX_CARDS:
+            self.misses += 1
+            return None
+        key = _key(codes, jokers, round_wilds)
+        bucket = _bucket(key, self.bucket_bits)
+        for entry in range(self.offsets[bucket], self.offsets[bucket + 1]):
+            if self.keys[entry] == key:
+                self.hits += 1
+                return _decode(self.values[entry], codes, order)
+        self.misses += 1
+        return None
+
+
+# Global tablebase instance, loaded at startup when the file exists
+tablebase = Tablebase()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=tablebase.path)
+    parser.add_argument("--max-round", type=int, default=DEFAULT_MAX_ROUND)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    entries = build(args.output, args.max_round)
+    size = os.path.getsize(args.output)
+    elapsed = time.perf_counter() - start
+    print(f"{entries} hands, {size // 1024} KiB in {elapsed:.1f}s -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+from five_crowns import SUIT
+import bench_solver
+
+
+def test_corpus_is_seeded_and_well_formed():
+    corpus = bench_solver.build_corpus(seed=1, count=4)
+    assert corpus.keys() == bench_solver.build_corpus(seed=1, count=4).keys()
+    assert corpus["random-7"][0] == 7
+    assert all(len(hand) == 7 for hand in corpus["random-7"][1])
+    for hand in corpus["wild-heavy"][1]:
+        assert 3 <= sum(card.suit == SUIT.JOKER for card in hand) <= 6
+    for hand in corpus["same-suit"][1]:
+        assert len({card.suit for card in hand if card.suit != SUIT.JOKER}) == 1
+    again = bench_solver.build_corpus(seed=1, count=4)
+    assert corpus["random-9"][1] == again["random-9"][1]
+
+
+def test_measure_and_compare():
+    round_num, hands = bench_solver.build_corpus(seed=1, count=3)["random-5"]
+    result = bench_solver.measure(round_num, hands)
+    assert result["hands"] == 3
+    assert 0 < result["p50_ms"] <= result["p99_ms"] <= result["max_ms"]
+
+    baseline = {"results": {"random-5": dict(result, p99_ms=1.0, max_ms=1.0)}}
+    report = {"results": {"random-5": dict(result, p99_ms=1.2, max_ms=3.0)}}
+    assert bench_solver.compare(report, baseline) == ["random-5 max_ms: 1.0 -> 3.0"]
@@ -1,6 +1,36 @@
-from five_crowns import SUIT
+import pickle
+
+import pytest
+
+from five_crowns import Card, CARDS, SUIT, card_from_name, decode_hand, encode_hand
 
 
 def test_init(card):
     assert card.suit == SUIT.SPADE
     assert card.rank == 3
+
+
+def test_cards_are_interned(card):
+    assert Card(SUIT.SPADE, 3) is card
+    assert card.code == 11
+    assert card.name == "spade-3"
+    assert Card(SUIT.JOKER, 99).code == 55
+    with pytest.raises(ValueError):
+        Card(SUIT.HEART, 14)
+
+
+def test_pickle_keeps_interned_card(card):
+    assert pickle.loads(pickle.dumps(card)) is card
+
+
+def test_card_from_name(card):
+    assert card_from_name("spade-3") is card
+    assert card_from_name("joker-99") is CARDS[55]
+    with pytest.raises(ValueError):
+        card_from_name("spade-2")
+
+
+def test_encode_hand():
+    hand = [Card(SUIT.HEART, 3), Card(SUIT.STAR, 13), Card(SUIT.JOKER, 99)]
+    assert encode_hand(hand) == bytes([0, 54, 55])
+    assert decode_hand(encode_hand(hand)) == hand
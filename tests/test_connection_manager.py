@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 
-from connection_manager import ConnectionManager
-from five_crowns import Game
+from connection_manager import ConnectionManager, Outbox
+from content import Content
+from five_crowns import Card, Game, SUIT
 
 
 class DummyWebSocket:
@@ -19,6 +22,8 @@ class DummyWebSocket:
 
 
 class FakeContent:
+    renders: list[str] = []
+
     def __init__(self, game, user_id, room_id="", room_name=""):
         pass
 
@@ -41,10 +46,12 @@ class FakeContent:
         return "score"
 
     def show_turn(self):
+        FakeContent.renders.append("turn")
         return "turn"
 
-    def show_actions(self):
-        return "actions"
+    def show_actions(self, user_id=None):
+        FakeContent.renders.append("actions")
+        return f"actions {user_id}"
 
     def show_logins(self):
         return "logins"
@@ -60,13 +67,213 @@ async def test_broadcast_removes_dead(monkeypatch):
 
     manager.active_connections = {"good": DummyWebSocket(False), "bad": DummyWebSocket(True)}
 
-    # No exception should bubble up; 'bad' should be removed
+    # No exception should bubble up; 'bad' should be removed once its writer fails
     await manager.broadcast({}, game, message_type="all")
+    await manager.drain()
 
     assert "bad" not in manager.active_connections
     assert "good" in manager.active_connections
 
 
+@pytest.mark.asyncio
+async def test_broadcast_renders_shared_fragments_once(monkeypatch):
+    game = Game()
+    manager = ConnectionManager(game, "test-room-id", "Test Room")
+    monkeypatch.setattr("connection_manager.Content", FakeContent)
+    monkeypatch.setattr(FakeContent, "renders", [])
+
+    sockets = {user_id: DummyWebSocket() for user_id in ("1", "2", "3")}
+    manager.active_connections = dict(sockets)
+    await manager.broadcast({}, game, message_type="all")
+    await manager.drain()
+
+    assert FakeContent.renders == ["turn", "actions"]
+    for user_id, websocket in sockets.items():
+        assert len(websocket.sent) == 1
+        assert "table" in websocket.sent[0]
+        assert f"actions {user_id}" in websocket.sent[0]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_separate_frames(monkeypatch):
+    game = Game()
+    manager = ConnectionManager(game, "test-room-id", "Test Room")
+    monkeypatch.setattr("connection_manager.Content", FakeContent)
+    manager.framing = "separate"
+
+    websocket = DummyWebSocket()
+    manager.active_connections = {"1": websocket}
+    await manager.broadcast({}, game, message_type="all")
+    await manager.drain()
+
+    assert websocket.sent == [
+        "game_alert", "player_alert", "table", "out", "score", "turn", "actions 1"
+    ]
+
+
+class StalledWebSocket(DummyWebSocket):
+    async def send_text(self, text):
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_others(monkeypatch):
+    game = Game()
+    manager = ConnectionManager(game, "test-room-id", "Test Room")
+    monkeypatch.setattr("connection_manager.Content", FakeContent)
+
+    fast = DummyWebSocket()
+    manager.active_connections = {"slow": StalledWebSocket(), "fast": fast}
+    await asyncio.wait_for(manager.broadcast({}, game, message_type="all"), 1)
+    await asyncio.wait_for(manager.outboxes["fast"].idle.wait(), 1)
+
+    assert "table" in fast.sent[0]
+    await manager.disconnect("slow")
+    await manager.disconnect("fast")
+
+
+def test_outbox_overflow_policies():
+    outbox = Outbox(DummyWebSocket(), 2, "resync")
+    outbox.seen["turn"] = 1
+    for message in ("a", "b", "c"):
+        assert outbox.put(message)
+    assert list(outbox.queue) == ["b", "c"]
+    assert outbox.dropped == 1
+    assert outbox.seen == {}
+
+    outbox = Outbox(DummyWebSocket(), 1, "disconnect")
+    assert outbox.put("a")
+    assert not outbox.put("b")
+
+
+@pytest.mark.asyncio
+async def test_full_queue_disconnects(monkeypatch):
+    game = Game()
+    manager = ConnectionManager(game, "test-room-id", "Test Room")
+    monkeypatch.setattr("connection_manager.Content", FakeContent)
+    manager.queue_size = 2
+    manager.queue_policy = "disconnect"
+    manager.framing = "separate"
+
+    manager.active_connections = {"slow": StalledWebSocket()}
+    await manager.broadcast({}, game, message_type="all")
+
+    assert "slow" not in manager.active_connections
+    assert "slow" not in manager.outboxes
+    # The close task is kept until it finishes
+    assert len(manager.closing) == 1
+    await asyncio.gather(*manager.closing)
+    assert not manager.closing
+
+
+@pytest.mark.asyncio
+async def test_broadcast_sends_only_changed_fragments(game_ready):
+    manager = ConnectionManager(game_ready, "test-room-id", "Test Room")
+    manager.framing = "separate"
+    sockets = {"1": DummyWebSocket(), "2": DummyWebSocket()}
+    manager.active_connections = dict(sockets)
+    await manager.broadcast({}, game_ready, message_type="all")
+    await manager.drain()
+    assert len(sockets["1"].sent) == 8
+
+    for websocket in sockets.values():
+        websocket.sent.clear()
+    game_ready.sort_cards("1", 0, 1)
+    await manager.broadcast({}, game_ready, message_type="all")
+    await manager.drain()
+
+    assert len(sockets["1"].sent) == 1
+    assert "#table" in sockets["1"].sent[0]
+    assert sockets["2"].sent == []
+
+
+@pytest.mark.asyncio
+async def test_out_cards_unchanged_when_out_player_sorts(game_ready):
+    manager = ConnectionManager(game_ready, "test-room-id", "Test Room")
+    manager.framing = "separate"
+    sockets = {"1": DummyWebSocket(), "2": DummyWebSocket()}
+    manager.active_connections = dict(sockets)
+    game_ready.players["1"].hand = [Card(SUIT.HEART, 3), Card(SUIT.STAR, 4), Card(SUIT.CLUB, 5)]
+    game_ready.go_out()
+    await manager.broadcast({}, game_ready, message_type="all")
+    await manager.drain()
+    out_cards = [message for message in sockets["2"].sent if 'id="out_cards"' in message]
+    for websocket in sockets.values():
+        websocket.sent.clear()
+
+    game_ready.sort_cards("1", 0, 2)
+    await manager.send_to("1")
+    await manager.broadcast({}, game_ready, message_type="all")
+    await manager.drain()
+
+    assert game_ready.out_cards == [Card(SUIT.HEART, 3), Card(SUIT.STAR, 4), Card(SUIT.CLUB, 5)]
+    assert sockets["2"].sent == []
+    assert out_cards == [Content(game_ready, "2", "test-room-id", "Test Room").show_out_cards()]
+
+
+@pytest.mark.asyncio
+async def test_send_to_only_renders_for_one_user(game_ready, monkeypatch):
+    manager = ConnectionManager(game_ready, "test-room-id", "Test Room")
+    sockets = {"1": DummyWebSocket(), "2": DummyWebSocket()}
+    manager.active_connections = dict(sockets)
+    await manager.broadcast({}, game_ready, message_type="all")
+    await manager.drain()
+    for websocket in sockets.values():
+        websocket.sent.clear()
+
+    rendered = []
+    render_shared = manager.render_shared
+    monkeypatch.setattr(
+        manager, "render_shared", lambda names: rendered.append(render_shared(names)) or {}
+    )
+    game_ready.sort_cards("1", 0, 1)
+    await manager.send_to("1")
+    await manager.drain()
+
+    assert rendered == [{}]
+    assert len(sockets["1"].sent) == 1
+    assert "#table" in sockets["1"].sent[0]
+    assert sockets["2"].sent == []
+
+
+@pytest.mark.asyncio
+async def test_connect_sends_current_state(game_ready):
+    manager = ConnectionManager(game_ready, "test-room-id", "Test Room")
+    manager.framing = "separate"
+    websocket = DummyWebSocket()
+    await manager.connect("1", websocket)
+    await manager.drain()
+
+    sent = "".join(websocket.sent)
+    for fragment in ("#table", 'id="turn"', 'id="logins"'):
+        assert fragment in sent
+    assert len(websocket.sent) == 9
+    await manager.disconnect("1")
+
+
+@pytest.mark.asyncio
+async def test_full_queue_resends_dropped_fragments(game_ready):
+    manager = ConnectionManager(game_ready, "test-room-id", "Test Room")
+    manager.queue_size = 1
+    websocket = StalledWebSocket()
+    manager.active_connections = {"1": websocket}
+    await manager.broadcast({}, game_ready, message_type="all")
+    # The writer takes the first frame and then stalls sending it
+    await asyncio.sleep(0)
+
+    game_ready.clear_game_alerts()
+    await manager.broadcast({}, game_ready, message_type="all")
+    game_ready.sort_cards("1", 0, 1)
+    await manager.broadcast({}, game_ready, message_type="all")
+
+    queue = manager.outboxes["1"].queue
+    assert len(queue) == 1
+    frame = queue[0]
+    for fragment in ('id="game_alerts"', "#table", 'id="turn"', 'id="logins"'):
+        assert fragment in frame
+    await manager.disconnect("1")
+
+
 @pytest.mark.asyncio
 async def test_disconnect_no_error_if_missing():
     game = Game()
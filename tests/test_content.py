@@ -1,3 +1,6 @@
+from content import USER_ID_SLOT
+
+
 def test_show_hand(content, game_ready):
     player = game_ready.player("1")
     game_ready.exchange_in_progress = True
@@ -9,6 +12,15 @@ def test_show_hand(content, game_ready):
     assert """<div class=""" in content.show_hand(player)
 
 
+def test_show_hand_suggests_discard(content, game_ready):
+    player = game_ready.player("1")
+    game_ready.exchange_in_progress = True
+    game_ready.current_player_index = 0
+    assert 'list-item suggested-discard"' in content.show_hand(player)
+    game_ready.exchange_in_progress = False
+    assert 'list-item suggested-discard"' not in content.show_hand(player)
+
+
 def test_show_table(content):
     assert len(content.show_table()) >= 100
     assert """<div hx-swap-oob="innerHTML:#table">""" in content.show_table()
@@ -26,6 +38,11 @@ def test_show_actions(content):
     assert len(content.show_actions()) > 10
 
 
+def test_show_actions_for_any_user(content):
+    shared = content.show_actions(USER_ID_SLOT)
+    assert shared.replace(USER_ID_SLOT, "2") == content.show_actions("2")
+
+
 def test_show_discard(content):
     assert len(content.show_discard()) > 10
 
@@ -41,3 +58,9 @@ def test_show_score_card(content):
 def test_show_player_alert(content):
     assert len(content.show_player_alert("1")) > 10
     assert len(content.show_player_alert("92")) > 10
+
+
+def test_oob_wrappers_are_closed(content):
+    # Fragments are concatenated into one frame, so none may leave a div open
+    for fragment in (content.show_table(), content.show_discard(), content.show_score_card()):
+        assert fragment.count("<div") == fragment.count("</div>")
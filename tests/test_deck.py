@@ -1,4 +1,6 @@
-from five_crowns import SUIT
+import pytest
+
+from five_crowns import No_Card, SUIT
 def test_init(deck):
     assert len(deck.cards) == 116  # 5 roles, each with 3 copies
     assert sum(1 for card in deck.cards if SUIT.SPADE ==  card.suit)==22
@@ -28,3 +30,28 @@ def test_repr(deck):
         repr(deck)
         == "3heart 4heart 5heart 6heart 7heart 8heart 9heart 10heart 11heart 12heart 13heart 3spade 4spade 5spade 6spade 7spade 8spade 9spade 10spade 11spade 12spade 13spade 3club 4club 5club 6club 7club 8club 9club 10club 11club 12club 13club 3diamond 4diamond 5diamond 6diamond 7diamond 8diamond 9diamond 10diamond 11diamond 12diamond 13diamond 3star 4star 5star 6star 7star 8star 9star 10star 11star 12star 13star 99joker 99joker 99joker 3heart 4heart 5heart 6heart 7heart 8heart 9heart 10heart 11heart 12heart 13heart 3spade 4spade 5spade 6spade 7spade 8spade 9spade 10spade 11spade 12spade 13spade 3club 4club 5club 6club 7club 8club 9club 10club 11club 12club 13club 3diamond 4diamond 5diamond 6diamond 7diamond 8diamond 9diamond 10diamond 11diamond 12diamond 13diamond 3star 4star 5star 6star 7star 8star 9star 10star 11star 12star 13star 99joker 99joker 99joker"
     )
+
+
+def test_deal(deck):
+    expected = [deck.cards[-1], deck.cards[-2], deck.cards[-3], deck.cards[-4]]
+    hands = deck.deal(2, 2)
+    assert hands == [[expected[0], expected[2]], [expected[1], expected[3]]]
+    assert deck.cards_remaining() == 112
+    with pytest.raises(No_Card):
+        deck.deal(7, 17)
+    assert deck.cards_remaining() == 112
+
+
+def test_deal_every_remaining_card(deck):
+    deck.cards = deck.cards[:6]
+    expected = deck.cards[::-1]
+    hands = deck.deal(2, 3)
+    assert hands == [expected[0::2], expected[1::2]]
+    assert deck.cards_remaining() == 0
+
+
+def test_restock(deck):
+    pile = deck.cards[:10]
+    deck.restock(pile)
+    assert deck.cards is pile
+    assert deck.cards_remaining() == 10
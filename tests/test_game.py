@@ -1,6 +1,7 @@
 from five_crowns import Player
 from five_crowns import Action
 from five_crowns import GameStatus, ActionStatus
+from five_crowns import Card, SUIT
 
 
 class TestGame:
@@ -23,6 +24,26 @@ class TestGame:
             ].name
         )
 
+    def test_seats(self, game_ready):
+        assert [player.id for player in game_ready.seats] == ["1", "2"]
+        assert game_ready.seat_of == {"1": 0, "2": 1}
+        assert game_ready.player_id("Adina") == "2"
+        assert game_ready.player_id("Nobody") == ""
+        assert game_ready.player_id_from_index(5) == ""
+        game_ready.current_player_index = 1
+        game_ready.current_dealer_index = 0
+        assert game_ready.whose_turn_name() == "Adina"
+        assert game_ready.whose_dealer_name() == "Lee"
+        game_ready.user_id = "2"
+        assert game_ready.your_turn()
+        game_ready.user_id = "1"
+        assert not game_ready.your_turn()
+        assert not game_ready.add_player("3", "Adina")
+        game_ready.reset()
+        assert game_ready.seats == [] and game_ready.seat_of == {}
+        assert game_ready.add_player("3", "Adina")
+        assert game_ready.seat_of == {"3": 0}
+
     def test_whose_turn(self, game_ready):
         assert isinstance(game_ready.whose_turn(), int)
 
@@ -71,6 +92,18 @@ class TestGame:
         for player in game_ready.players.values():
             assert len(player.hand) == 3
 
+    def test_enabled_actions_bitmask(self, game_ready):
+        snapshot = game_ready.enabled_actions
+        actions = game_ready.actions
+        game_ready.enable_one_action("Go_out")
+        assert game_ready.enabled_actions != snapshot
+        assert game_ready.action_from_action_name("Go_out").action_status == ActionStatus.ENABLED
+        game_ready.disable_one_action("Go_out")
+        assert game_ready.enabled_actions == snapshot
+        # Views are shared per bitmask rather than rebuilt
+        assert game_ready.actions is actions
+        assert [action.name for action in actions][:2] == ["Start", "Restart"]
+
     def test_action_from_action_name(self, game_ready):
         for action in game_ready.actions:
             assert isinstance(game_ready.action_from_action_name(action.name), Action)
@@ -131,6 +164,25 @@ class TestGame:
             player.hand == expected_order
         ), "Complete hand order doesn't match expected"
 
+    def test_fragment_versions(self, game_ready):
+        versions = dict(game_ready.versions)
+        game_ready.sort_cards("1", 0, 1)
+        changed = {
+            key for key, version in game_ready.versions.items() if version != versions.get(key)
+        }
+        assert changed == {"hand:1"}
+
+        game_ready.clear_game_alerts()
+        assert game_ready.versions["alerts"] == game_ready.version
+
+    def test_rendering_after_game_over_keeps_versions(self, game_ready):
+        game_ready.round_number = 14
+        game_ready.is_game_over()
+        versions = dict(game_ready.versions)
+        game_ready.round_wild()
+        game_ready.is_game_over()
+        assert game_ready.versions == versions
+
     def test_round_wild(self, game_ready):
         game_ready.round_number = 3
         assert game_ready.round_wild() == "3's are wild"
@@ -147,3 +199,62 @@ class TestGame:
         game_ready.round_number = 13
         assert game_ready.round_wild() == "King's are wild"
 
+    def test_score_all_hands(self, game_ready):
+        game_ready.round_number = 3
+        game_ready.player("1").hand = [
+            Card(SUIT.HEART, 5),
+            Card(SUIT.HEART, 6),
+            Card(SUIT.HEART, 7),
+        ]
+        game_ready.player("2").hand = [
+            Card(SUIT.HEART, 4),
+            Card(SUIT.SPADE, 9),
+            Card(SUIT.JOKER, 99),
+        ]
+        assert game_ready.score_all_hands() == {"1": 0, "2": 63}
+        assert game_ready.player("2").score == 63
+
+        game_ready.update_score_card()
+        assert game_ready.score_card[3] == [0, 63]
+
+    def test_score_totals_are_running(self, game_ready):
+        game_ready.player("2").hand = [Card(SUIT.HEART, 4), Card(SUIT.SPADE, 9)]
+        game_ready.player("1").hand = []
+        game_ready.update_score_card()
+        assert game_ready.total_score_card() == [0, 13]
+        # Rescoring the same round replaces its scores rather than adding them
+        game_ready.player("2").hand = [Card(SUIT.SPADE, 9)]
+        game_ready.update_score_card()
+        assert game_ready.total_score_card() == [0, 9]
+        game_ready.round_number = 4
+        game_ready.player("1").hand = [Card(SUIT.CLUB, 5)]
+        game_ready.update_score_card()
+        assert game_ready.total_score_card() == [5, 18]
+        assert game_ready.player("2").total_score == 18
+        assert game_ready.score_card[4] == [5, 9]
+
+    def test_hands_to_score(self, game_ready):
+        player = game_ready.player("1")
+        # Picks score nothing
+        assert game_ready.hands_to_score("1", "Pick_from_deck") == []
+        assert len(game_ready.hands_to_score("1", "Go_out")) == 2
+
+        # A discard that cannot go out is not scored
+        player.hand = [Card(SUIT.HEART, 5), Card(SUIT.CLUB, 9), Card(SUIT.SPADE, 11)]
+        player.add_card(Card(SUIT.STAR, 13))
+        game_ready.card_to_exchange = player.hand[0]
+        assert game_ready.hands_to_score("1") == []
+
+        # ...unless it is the last turn of the round
+        game_ready.last_turn_in_round = 1
+        hands = game_ready.hands_to_score("1")
+        assert len(hands) == 2
+        assert hands[0] == player.hand[1:]
+        assert hands[1] is game_ready.player("2").hand
+
+        # ...or when the discard lets the player go out
+        game_ready.last_turn_in_round = 0
+        player.hand = [Card(SUIT.HEART, 5), Card(SUIT.HEART, 6), Card(SUIT.HEART, 7)]
+        player.add_card(Card(SUIT.STAR, 13))
+        game_ready.card_to_exchange = player.hand[-1]
+        assert len(game_ready.hands_to_score("1")) == 2
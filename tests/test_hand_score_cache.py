@@ -0,0 +1,60 @@
+from five_crowns import Card, SUIT, HandScoreCache
+
+
+def test_cache_hit_ignores_card_order():
+    cache = HandScoreCache()
+    hand = [Card(SUIT.HEART, 5), Card(SUIT.HEART, 6), Card(SUIT.HEART, 7)]
+    assert cache.solve(hand, 3)["score"] == 0
+    assert cache.solve(list(reversed(hand)), 3)["score"] == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_layout_uses_callers_cards():
+    cache = HandScoreCache()
+    hand = [Card(SUIT.HEART, 7), Card(SUIT.SPADE, 7), Card(SUIT.CLUB, 7)]
+    cache.solve(hand, 3)
+    reordered = [hand[2], hand[0], hand[1]]
+    result = cache.solve(reordered, 3)
+    assert all(a is b for a, b in zip(result["books"][0], reordered))
+
+
+def test_cache_keyed_on_round():
+    cache = HandScoreCache()
+    hand = [Card(SUIT.HEART, 4), Card(SUIT.SPADE, 9), Card(SUIT.CLUB, 3)]
+    assert cache.solve(hand, 3)["score"] == 33
+    assert cache.solve(hand, 4)["score"] == 32
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = HandScoreCache(maxsize=2)
+    hands = [[Card(SUIT.HEART, rank)] for rank in (4, 5, 6)]
+    cache.solve(hands[0], 3)
+    cache.solve(hands[1], 3)
+    cache.solve(hands[0], 3)
+    cache.solve(hands[2], 3)
+    assert cache.stats()["evictions"] == 1
+    cache.solve(hands[0], 3)
+    assert cache.stats()["hits"] == 2
+    cache.solve(hands[1], 3)
+    assert cache.stats()["misses"] == 4
+
+    cache.clear()
+    assert cache.stats() == {
+        "size": 0,
+        "maxsize": 2,
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+    }
+
+
+def test_can_go_out_counts_hits_and_misses():
+    cache = HandScoreCache()
+    hand = [Card(SUIT.HEART, 5), Card(SUIT.HEART, 6), Card(SUIT.HEART, 7)]
+    assert cache.can_go_out(hand, 3)
+    cache.solve(hand, 3)
+    assert cache.can_go_out(hand, 3)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,52 @@
+import random
+
+from five_crowns import Card, SUIT
+import meld_oracle
+import solver_registry
+
+
+def test_is_group():
+    def kinds(*cards):
+        return [meld_oracle.describe(card, 5) for card in cards]
+
+    assert meld_oracle.is_group(kinds(Card(SUIT.HEART, 7), Card(SUIT.STAR, 7), Card(SUIT.STAR, 7)))
+    assert meld_oracle.is_group(kinds(Card(SUIT.HEART, 7), Card(SUIT.HEART, 9), Card(SUIT.JOKER, 99)))
+    assert meld_oracle.is_group(kinds(Card(SUIT.CLUB, 5), Card(SUIT.SPADE, 5), Card(SUIT.JOKER, 99)))
+    assert not meld_oracle.is_group(kinds(Card(SUIT.HEART, 7), Card(SUIT.HEART, 10), Card(SUIT.JOKER, 99)))
+    assert not meld_oracle.is_group(kinds(Card(SUIT.HEART, 7), Card(SUIT.HEART, 7), Card(SUIT.HEART, 8)))
+    assert not meld_oracle.is_group(kinds(Card(SUIT.HEART, 7), Card(SUIT.CLUB, 8), Card(SUIT.JOKER, 99)))
+
+
+def test_score_hand():
+    hand = [
+        Card(SUIT.HEART, 3),
+        Card(SUIT.HEART, 4),
+        Card(SUIT.JOKER, 99),
+        Card(SUIT.CLUB, 9),
+        Card(SUIT.CLUB, 5),
+    ]
+    # Round 5: 9-joker-5 book, hearts left over
+    assert meld_oracle.score_hand(hand, 5) == 3 + 4
+    # Round 9: 3-4-joker-9 heart run
+    assert meld_oracle.score_hand(hand, 9) == 5
+    assert meld_oracle.score_hand(hand[:4], 13) == 9
+    assert meld_oracle.score_hand([], 3) == 0
+
+
+def test_solvers_agree_with_oracle():
+    rng = random.Random(3)
+    for round_num in (3, 8, 13):
+        for engine in solver_registry.ENGINES:
+            solver = meld_oracle.solver_for(engine)
+            assert meld_oracle.fuzz(solver, round_num, 30, rng) is None, engine
+
+
+def test_shrinks_counterexample():
+    def broken(hand, round_num):
+        # Miscounts any hand holding a joker
+        score = meld_oracle.solver_for("count")(hand, round_num)
+        return score + any(card.suit == SUIT.JOKER for card in hand)
+
+    hand = [Card(SUIT.HEART, rank) for rank in range(3, 9)] + [Card(SUIT.JOKER, 99)]
+    assert meld_oracle.mismatch(broken, hand, 13) == (1, 0)
+    assert meld_oracle.shrink(broken, hand, 13) == [Card(SUIT.JOKER, 99)]
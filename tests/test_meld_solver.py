@@ -0,0 +1,196 @@
+import random
+
+from five_crowns import Card, Deck, SUIT, encode_hand
+import meld_solver
+
+
+def test_pack_hand():
+    hand = [
+        Card(SUIT.HEART, 4),
+        Card(SUIT.HEART, 4),
+        Card(SUIT.STAR, 13),
+        Card(SUIT.JOKER, 99),
+        Card(SUIT.CLUB, 5),
+    ]
+    counts, jokers, round_wilds = meld_solver.pack_hand(hand, 5)
+    assert jokers == 1
+    assert round_wilds == 1
+    assert meld_solver.cell_count(counts, meld_solver.cell_index(0, 4)) == 2
+    assert meld_solver.cell_count(counts, meld_solver.cell_index(4, 13)) == 1
+
+
+def test_solve_hand_full_cover():
+    hand = [
+        Card(SUIT.CLUB, 3),
+        Card(SUIT.DIAMOND, 4),
+        Card(SUIT.SPADE, 4),
+        Card(SUIT.CLUB, 4),
+        Card(SUIT.DIAMOND, 6),
+        Card(SUIT.CLUB, 4),
+        Card(SUIT.CLUB, 5),
+        Card(SUIT.HEART, 4),
+        Card(SUIT.DIAMOND, 5),
+    ]
+    result = meld_solver.solve_hand(hand, 9)
+    assert result["score"] == 0
+    assert result["remaining"] == []
+    assert len(result["books"]) == 1
+    assert len(result["runs"]) == 2
+
+
+def test_solve_hand_leftover_wild_penalties():
+    # A lone joker costs 50, a lone round wild costs 20
+    hand = [Card(SUIT.HEART, 3), Card(SUIT.SPADE, 8), Card(SUIT.JOKER, 99)]
+    assert meld_solver.solve_hand(hand, 3)["score"] == 0
+    hand = [Card(SUIT.HEART, 4), Card(SUIT.SPADE, 9), Card(SUIT.JOKER, 99)]
+    assert meld_solver.solve_hand(hand, 3)["score"] == 63
+    hand = [Card(SUIT.HEART, 4), Card(SUIT.SPADE, 9), Card(SUIT.CLUB, 3)]
+    assert meld_solver.solve_hand(hand, 3)["score"] == 33
+
+
+def test_solve_hand_spare_wilds_join_groups():
+    hand = [
+        Card(SUIT.HEART, 5),
+        Card(SUIT.HEART, 6),
+        Card(SUIT.HEART, 7),
+        Card(SUIT.JOKER, 99),
+    ]
+    result = meld_solver.solve_hand(hand, 4)
+    assert result["score"] == 0
+    assert len(result["runs"][0]) == 4
+    assert result["assigned_wilds"][0]["assigned_rank"] == 8
+
+    hand = [Card(SUIT.JOKER, 99)] * 4
+    result = meld_solver.solve_hand(hand, 4)
+    assert result["score"] == 0
+    assert len(result["books"][0]) == 4
+
+
+def test_solve_hand_full_length_run():
+    hand = [Card(SUIT.STAR, rank) for rank in range(3, 14)]
+    result = meld_solver.solve_hand(hand + [Card(SUIT.JOKER, 99)], 3)
+    assert result["score"] == 0
+    assert sum(len(group) for group in result["books"] + result["runs"]) == 12
+
+
+def test_hand_evaluator_tracks_adds_and_removes():
+    hand = [Card(SUIT.HEART, 5), Card(SUIT.JOKER, 99), Card(SUIT.SPADE, 7)]
+    evaluator = meld_solver.HandEvaluator()
+    assert evaluator.packed(hand, 7) == meld_solver.pack_hand(hand, 7)
+
+    card = Card(SUIT.CLUB, 9)
+    hand.append(card)
+    evaluator.add(card)
+    assert evaluator.packed(hand, 7) == meld_solver.pack_hand(hand, 7)
+
+    hand.remove(Card(SUIT.JOKER, 99))
+    evaluator.remove(Card(SUIT.JOKER, 99))
+    assert evaluator.packed(hand, 7) == meld_solver.pack_hand(hand, 7)
+
+    # A different round repacks with that round's wilds
+    assert evaluator.packed(hand, 5) == meld_solver.pack_hand(hand, 5)
+
+
+def test_meld_search_memo_is_reused_across_hands():
+    search = meld_solver.MeldSearch()
+    hand = [Card(SUIT.HEART, rank) for rank in range(4, 11)]
+    assert search.solve(*meld_solver.pack_hand(hand, 3))[0] == 0
+    states = len(search.memo)
+    assert search.solve(*meld_solver.pack_hand(hand[1:], 3))[0] == 0
+    assert len(search.memo) < 2 * states
+
+
+def test_solve_bounded():
+    hand = [
+        Card(SUIT.CLUB, 4),
+        Card(SUIT.CLUB, 6),
+        Card(SUIT.CLUB, 8),
+        Card(SUIT.CLUB, 8),
+        Card(SUIT.CLUB, 9),
+        Card(SUIT.CLUB, 13),
+        Card(SUIT.DIAMOND, 8),
+        Card(SUIT.DIAMOND, 10),
+        Card(SUIT.JOKER, 99),
+        Card(SUIT.SPADE, 8),
+        Card(SUIT.STAR, 3),
+        Card(SUIT.STAR, 4),
+        Card(SUIT.STAR, 8),
+        Card(SUIT.STAR, 13),
+    ]
+    packed = meld_solver.pack_hand(hand, 13)
+    exact = meld_solver.solve_packed(*packed)
+
+    solution, proven = meld_solver.solve_bounded(*packed, 5.0)
+    assert proven
+    assert solution[0] == exact[0]
+
+    # Out of time: the greedy seed is still a complete, valid arrangement
+    solution, proven = meld_solver.solve_bounded(*packed, 0.0)
+    assert not proven
+    assert solution[0] >= exact[0]
+    result = meld_solver.layout_hand(hand, 13, solution)
+    assert sum(card.rank for card in result["remaining"]) == solution[0]
+
+
+def test_score_by_keeps_finished_states():
+    rng = random.Random(2)
+    hand = rng.sample(Deck().cards, 14)
+    packed = meld_solver.pack_hand(hand, 13)
+    search = meld_solver.MeldSearch()
+    search.CHECK_EVERY = 1
+    assert search.score_by(*packed, 0.0) is None
+    assert all(value[0] == search.best(*key) for key, value in search.memo.items())
+    assert search.score_by(*packed, float("inf")) == meld_solver.solve_packed(*packed)[0]
+
+
+def test_budgeted_discard_scores_share_the_memo():
+    rng = random.Random(3)
+    hand = rng.sample(Deck().cards, 14)
+    evaluator = meld_solver.HandEvaluator()
+    exact = evaluator.discard_scores(hand, 13)
+
+    evaluator = meld_solver.HandEvaluator()
+    assert evaluator.discard_scores(hand, 13, budget=60.0) == exact
+    states = len(evaluator.search.memo)
+    # A second hint for the same hand is answered from the shared memo
+    assert evaluator.discard_scores(hand, 13, budget=0.0) == exact
+    assert len(evaluator.search.memo) == states
+
+
+def test_candidates_treat_duplicates_and_wilds_as_counts():
+    hand = (
+        [Card(SUIT.HEART, 7)] * 2
+        + [Card(SUIT.SPADE, 7)] * 2
+        + [Card(SUIT.JOKER, 99)] * 3
+        + [Card(SUIT.CLUB, 13), Card(SUIT.STAR, 13)]
+    )
+    counts, jokers, round_wilds = meld_solver.pack_hand(hand, 13)
+    assert (jokers, round_wilds) == (3, 2)
+    # One book per (hearts, spades) count pair, whichever copies or wilds fill it
+    books = meld_solver._book_candidates(counts, 0, 7, jokers + round_wilds)
+    assert len(books) == 2 * 3
+
+    # Trading one physical duplicate or wild for another explores the same states
+    search = meld_solver.MeldSearch()
+    search.solve(counts, jokers, round_wilds)
+    states = len(search.memo)
+    swapped = [Card(card.suit, card.rank) for card in reversed(hand)]
+    search.solve(*meld_solver.pack_hand(swapped, 13))
+    assert len(search.memo) == states
+
+
+def test_can_cover_agrees_with_solver():
+    rng = random.Random(5)
+    cards = Deck().cards
+    for _ in range(300):
+        round_num = rng.randint(3, 13)
+        hand = rng.sample(cards, round_num)
+        packed = meld_solver.pack_hand(hand, round_num)
+        assert meld_solver.can_cover(*packed) == (
+            meld_solver.solve_packed(*packed)[0] == 0
+        )
+
+
+def test_pack_codes_matches_pack_hand():
+    hand = Deck().cards[::9]
+    assert meld_solver.pack_codes(encode_hand(hand), 7) == meld_solver.pack_hand(hand, 7)
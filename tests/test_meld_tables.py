@@ -0,0 +1,35 @@
+from five_crowns import Card, SUIT
+import meld_solver
+import meld_tables
+
+
+def test_spread_matches_cell_units():
+    rank_bits = 0b101  # ranks 3 and 5
+    expected = meld_solver.CELL_UNIT[meld_solver.cell_index(2, 3)] + (
+        meld_solver.CELL_UNIT[meld_solver.cell_index(2, 5)]
+    )
+    assert meld_tables.SPREAD[2][rank_bits] == expected
+
+
+def test_row_presence():
+    hand = [
+        Card(SUIT.CLUB, 3),
+        Card(SUIT.CLUB, 3),
+        Card(SUIT.CLUB, 9),
+        Card(SUIT.CLUB, 13),
+        Card(SUIT.HEART, 4),
+    ]
+    counts, _, _ = meld_solver.pack_hand(hand, 5)
+    assert meld_tables.row_presence(counts, 2) == 0b10001000001
+    assert meld_tables.row_presence(counts, 0) == 0b10
+    assert meld_tables.row_presence(counts, 4) == 0
+
+
+def test_run_shapes():
+    # Lowest natural at rank 3 with 4 and 6 present above it
+    assert meld_tables.run_shapes(0, 0b101, 0) == ()
+    shapes = set(meld_tables.run_shapes(0, 0b101, 1))
+    assert shapes == {(0b11, 1, 8), (0b1011, 1, 7)}
+    shapes = set(meld_tables.run_shapes(0, 0b101, 2))
+    assert shapes == {(0b1, 2, 8), (0b11, 1, 8), (0b1011, 1, 7), (0b1001, 2, 7)}
+    assert meld_tables.run_shapes(0, 0b101, 1) is meld_tables.run_shapes(0, 0b101, 1)
@@ -1,5 +1,7 @@
 import pytest
-from five_crowns import Card, SUIT
+from five_crowns import Card, SUIT, score_cache
+import meld_solver
+from meld_solver import pack_hand
 
 
 def test_init(player):
@@ -24,6 +26,54 @@ def test_discard(player, deck):
     assert len(player.hand) == 3
 
 
+def test_draw_and_discard_keep_evaluator_in_sync(player, deck):
+    player.evaluator.sync(player.hand, 3)
+    for _ in range(4):
+        player.draw(deck)
+    player.discard(player.hand[1], deck)
+    assert player.evaluator.round_num == 3
+    assert player.evaluator.size == len(player.hand)
+    assert (
+        player.evaluator.counts,
+        player.evaluator.jokers,
+        player.evaluator.round_wilds,
+    ) == pack_hand(player.hand, 3)
+    assert player.score_hand(3).get("score") == 0
+
+    player.hand = [Card(SUIT.HEART, 9)]
+    assert player.evaluator.round_num is None
+    assert player.score_hand(3).get("score") == 9
+
+
+def test_warm_memo_answers_go_out_and_round_end(player, deck, monkeypatch):
+    player.hand = [
+        Card(SUIT.HEART, 5),
+        Card(SUIT.HEART, 6),
+        Card(SUIT.HEART, 7),
+        Card(SUIT.CLUB, 9),
+        Card(SUIT.SPADE, 12),
+    ]
+    score_cache.clear()
+    best, score = player.best_discards(4)[0]
+    assert (best, score) == (Card(SUIT.SPADE, 12), 9)
+    player.discard(best, deck)
+
+    # The hand left after the discard is answered from the player's memo
+    def not_called(*args):
+        raise AssertionError("solved again")
+
+    def memo_only(search, *key):
+        if key not in search.memo:
+            not_called()
+        return search.memo[key][0]
+
+    monkeypatch.setattr(meld_solver, "can_cover", not_called)
+    monkeypatch.setattr(meld_solver.MeldSearch, "best", memo_only)
+    assert not player.can_go_out(4)
+    assert score_cache.solve_many([player.hand], 4, [player.evaluator])[0]["score"] == 9
+    score_cache.clear()
+
+
 def test_get_index(player):
     player.hand = [Card(SUIT.SPADE, 3), Card(SUIT.STAR, 5)]
     card = Card(SUIT.SPADE, 3)
@@ -129,6 +179,48 @@ def test_score_hand(player):
     assert score.get("score") == 3
 
 
+def test_can_go_out(player):
+    player.hand = [Card(SUIT.HEART, 7), Card(SUIT.JOKER, 99), Card(SUIT.CLUB, 3)]
+    assert player.can_go_out(3)
+    player.hand = [Card(SUIT.HEART, 13), Card(SUIT.JOKER, 99), Card(SUIT.HEART, 4)]
+    assert not player.can_go_out(3)
+    player.hand = [
+        Card(SUIT.STAR, 7),
+        Card(SUIT.HEART, 7),
+        Card(SUIT.HEART, 7),
+        Card(SUIT.SPADE, 3),
+    ]
+    assert not player.can_go_out(4)
+    player.hand = [
+        Card(SUIT.JOKER, 99),
+        Card(SUIT.SPADE, 11),
+        Card(SUIT.SPADE, 10),
+        Card(SUIT.HEART, 4),
+    ]
+    assert player.can_go_out(4)
+
+
+def test_best_discards(player):
+    player.hand = [
+        Card(SUIT.HEART, 5),
+        Card(SUIT.SPADE, 12),
+        Card(SUIT.HEART, 6),
+        Card(SUIT.HEART, 7),
+    ]
+    discards = player.best_discards(3)
+    assert discards[0] == (Card(SUIT.SPADE, 12), 0)
+    assert [score for _, score in discards] == [0, 23, 24, 25]
+    assert player.best_discards(3) == discards
+
+
+def test_score_hand_bounded(player):
+    player.hand = [Card(SUIT.HEART, 5), Card(SUIT.HEART, 6), Card(SUIT.SPADE, 12)]
+    score = player.score_hand_bounded(3, 1.0)
+    assert score.get("score") == 23
+    assert score.get("optimal")
+    assert player.score == 0
+
+
 def test_auto_sort_hand(player):
     player.hand = [
         Card(SUIT.STAR, 7),
@@ -1,8 +1,11 @@
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 # Assuming the process_message function is in a module named your_module
 from app import process_message
+from room_manager import RoomManager
 
 
 @pytest.fixture
@@ -73,3 +76,34 @@ async def test_process_message(
         assert manager_mock.broadcast.called
 
         # game_mock.set_current_action.assert_called_with("Test message", user_id)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_messages_do_not_interleave():
+    room = RoomManager().create_room("Race", seed=3)
+    room.game.add_player("a", "Alice")
+    room.game.add_player("b", "Bob")
+    room.game.start_game()
+    turn = room.game.player_id_from_index(room.game.current_player_index)
+    other = "b" if turn == "a" else "a"
+    top_discard = room.game.top_discard()
+
+    async def slow_prefetch(hands, round_num):
+        # Large hands are solved in the pool, which yields to the event loop
+        await asyncio.sleep(0.01)
+        return 0
+
+    mock_room_manager = MagicMock()
+    mock_room_manager.get_room = MagicMock(return_value=room)
+    with patch("app.room_manager", mock_room_manager), patch(
+        "app.solver_pool.prefetch", slow_prefetch
+    ):
+        await asyncio.gather(
+            process_message(room.room_id, turn, {"message_txt": "Pick_from_deck"}),
+            process_message(room.room_id, other, {"message_txt": "Pick_from_discard"}),
+        )
+
+    assert room.game.current_action.name == "Pick_from_deck"
+    assert room.game.current_action_player_id == turn
+    assert room.game.top_discard() is top_discard
+    assert len(room.game.player(turn).hand) == room.game.round_number + 1
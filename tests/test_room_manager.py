@@ -101,6 +101,21 @@ class TestRoomManager:
         assert manager.rooms[room2.room_id] == room2
         assert manager.rooms[room3.room_id] == room3
 
+    def test_create_room_with_seed_replays_deals(self):
+        """Rooms created with the same seed deal the same cards"""
+        manager = RoomManager()
+        rooms = [manager.create_room("Replay", seed=42) for _ in range(2)]
+        for room in rooms:
+            assert room.game.seed == 42
+            room.game.add_player("1", "Lee")
+            room.game.add_player("2", "Adina")
+            room.game.start_game()
+        first, second = (room.game for room in rooms)
+        assert first.current_player_index == second.current_player_index
+        assert first.player("1").hand == second.player("1").hand
+        assert first.deck.cards == second.deck.cards
+        assert manager.create_room("Unseeded").game.seed is not None
+
     def test_create_room_with_custom_max_players(self):
         """Test creating a room with custom max_players"""
         manager = RoomManager()
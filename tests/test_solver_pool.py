@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from five_crowns import Card, SUIT, HandScoreCache
+import solver_pool
+from solver_pool import SolverPool
+import tablebase
+
+
+@pytest.fixture
+def large_hand():
+    return [Card(SUIT.HEART, rank) for rank in range(3, 14)]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_fills_cache(large_hand):
+    pool = SolverPool()
+    pool.kind = "process"
+    pool.enabled = True
+    pool.min_cards = 10
+    cache = HandScoreCache()
+    try:
+        solved = await pool.prefetch([large_hand, large_hand], 13, cache)
+    finally:
+        pool.shutdown()
+    assert solved == 1
+    assert cache.key(large_hand, 13) in cache
+    assert cache.solve(large_hand, 13)["score"] == 0
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prefetch_skips_small_hands_and_disabled_pool(large_hand):
+    pool = SolverPool()
+    pool.min_cards = 10
+    cache = HandScoreCache()
+    assert await pool.prefetch([large_hand[:5]], 13, cache) == 0
+    pool.enabled = False
+    assert await pool.prefetch([large_hand], 13, cache) == 0
+    assert pool.executor is None
+
+
+@pytest.mark.asyncio
+async def test_workers_load_the_tablebase(tmp_path, monkeypatch):
+    path = str(tmp_path / "round3.bin")
+    tablebase.build(path, max_round=3)
+    monkeypatch.setattr(tablebase.tablebase, "path", path)
+    pool = SolverPool()
+    pool.kind = "process"
+    try:
+        loop = asyncio.get_running_loop()
+        loaded = await loop.run_in_executor(
+            pool.get_executor(), solver_pool._tablebase_loaded
+        )
+    finally:
+        pool.shutdown()
+    assert loaded
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from five_crowns import Card, SUIT, HandScoreCache
+import meld_solver
+import solver_registry
+from solver_registry import SolverRegistry
+
+
+@pytest.fixture
+def registry():
+    registry = SolverRegistry()
+    registry.pinned = None
+    registry.samples = 3
+    return registry
+
+
+def test_engines_agree():
+    rng = random.Random(4)
+    for size in (3, 9, 14):
+        for _ in range(5):
+            hand = solver_registry.sample_hand(rng, size)
+            scores = {
+                name: solver_registry.run_engine(name, *hand)[0]
+                for name in solver_registry.ENGINES
+            }
+            assert len(set(scores.values())) == 1, scores
+
+
+def test_calibrate_routes_every_size(registry):
+    by_size = registry.calibrate()
+    assert sorted(by_size) == list(range(3, 15))
+    assert set(by_size.values()) <= set(solver_registry.ENGINES)
+    assert registry.engine_for(13) == by_size[13]
+    assert registry.engine_for(40) == solver_registry.DEFAULT_ENGINE
+
+
+def test_calibrate_skips_wrong_engine(registry, monkeypatch):
+    def wrong(counts, jokers, round_wilds, search=None):
+        return (0, ())
+
+    monkeypatch.setitem(solver_registry.ENGINES, "wrong", wrong)
+    registry.calibrate()
+    assert "wrong" not in registry.timings[10]
+    assert "wrong" not in registry.by_size.values()
+
+
+def test_pinned_engine(monkeypatch):
+    monkeypatch.setenv("SOLVER_ENGINE", "anytime")
+    registry = SolverRegistry()
+    assert registry.calibrate() == {}
+    assert registry.engine_for(5) == "anytime"
+    monkeypatch.setenv("SOLVER_ENGINE", "missing")
+    assert SolverRegistry().pinned is None
+
+
+def test_score_cache_uses_routed_engine(monkeypatch):
+    calls = []
+
+    def counting(counts, jokers, round_wilds, search=None):
+        calls.append(counts)
+        return solver_registry.ENGINES["count"](counts, jokers, round_wilds, search)
+
+    monkeypatch.setitem(solver_registry.ENGINES, "counting", counting)
+    monkeypatch.setattr(solver_registry.solver_registry, "pinned", "counting")
+    hand = [Card(SUIT.STAR, 5), Card(SUIT.STAR, 6), Card(SUIT.STAR, 7)]
+    assert HandScoreCache().solve(hand, 9)["score"] == 0
+    assert len(calls) == 1
+
+
+def test_calibrate_needs_a_clear_win(registry, monkeypatch):
+    monkeypatch.setattr(solver_registry, "CALIBRATION_MARGIN", 0)
+    by_size = registry.calibrate()
+    assert set(by_size.values()) == {solver_registry.DEFAULT_ENGINE}
+
+
+def test_search_keeps_memo_engine(registry, monkeypatch):
+    calls = []
+
+    def cold(counts, jokers, round_wilds, search=None):
+        calls.append(counts)
+        return solver_registry.ENGINES["count"](counts, jokers, round_wilds)
+
+    monkeypatch.setitem(solver_registry.ENGINES, "cold", cold)
+    registry.by_size[13] = "cold"
+    search = meld_solver.MeldSearch()
+    hand = solver_registry.sample_hand(random.Random(1), 13)
+    registry.solve(*hand, 13, search)
+    assert calls == []
+    registry.solve(*hand, 13)
+    assert len(calls) == 1
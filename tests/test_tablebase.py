@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from five_crowns import Deck, SUIT
+import meld_oracle
+import meld_solver
+import tablebase
+
+
+@pytest.fixture(scope="module")
+def small_table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("tablebase") / "round3.bin")
+    assert tablebase.build(path, max_round=3) > 0
+    table = tablebase.Tablebase(path)
+    assert table.load()
+    return table
+
+
+def test_lookup_matches_solver(small_table):
+    rng = random.Random(2)
+    deck = Deck().cards
+    for _ in range(300):
+        hand = rng.sample(deck, rng.randint(3, 4))
+        packed = meld_solver.pack_hand(hand, 3)
+        solution = small_table.lookup(*packed)
+        assert solution is not None
+        assert solution[0] == meld_solver.solve_packed(*packed)[0]
+
+        layout = meld_solver.layout_hand(hand, 3, solution)
+        for group in layout["books"] + layout["runs"]:
+            assert meld_oracle.is_group([meld_oracle.describe(card, 3) for card in group])
+        kinds = [meld_oracle.describe(card, 3) for card in layout["remaining"]]
+        assert sum(meld_oracle.penalty(kind) for kind in kinds) == solution[0]
+
+
+def test_lookup_misses_hands_outside_the_table(small_table):
+    rng = random.Random(5)
+    deck = [card for card in Deck().cards if card.suit != SUIT.JOKER]
+    hand = rng.sample(deck, 9)
+    assert small_table.lookup(*meld_solver.pack_hand(hand, 13)) is None
+    assert small_table.misses >= 1
+
+
+def test_missing_or_foreign_file(tmp_path):
+    assert not tablebase.Tablebase(str(tmp_path / "missing.bin")).load()
+    foreign = tmp_path / "foreign.bin"
+    foreign.write_bytes(b"\0" * 64)
+    table = tablebase.Tablebase(str(foreign))
+    assert not table.load()
+    assert table.lookup(0, 3, 0) is None